@@ -0,0 +1,212 @@
+# Finding alt:V installations on disk. Candidate roots are walked in
+# parallel up to a depth limit, skipping system and tool directories, and
+# every folder holding both altv.exe and altv.toml is an installation. The
+# listing of each visited directory is kept in an index keyed by the
+# directory's mtime; a directory's mtime only changes when entries are added,
+# removed or renamed in it, so on later scans unchanged directories cost a
+# stat instead of a listing.
+
+import json
+import os
+import string
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from paths import ALTV_EXE, path_key
+from persistence import atomic_write
+from toml_config import ALTV_TOML
+
+DISCOVERY_INDEX_FILE = 'altv_installs.json'
+DISCOVERY_WORKERS = 8
+MAX_DEPTH = 4        # Levels below a drive or home folder that are searched
+KNOWN_FOLDER_DEPTH = 2  # Levels below the parent of an already configured folder
+INSTALL_FILES = (ALTV_EXE, ALTV_TOML)
+INDEX_VERSION = 1
+
+# Directory names (lowercase) that never contain an install worth offering
+PRUNED_DIRS = frozenset({
+    '$recycle.bin', 'system volume information', 'windows', 'winsxs', 'programdata', 'appdata',
+    'recovery', 'perflogs', 'msocache', 'node_modules', '__pycache__', 'site-packages', 'cache',
+    'crashdumps', 'logs',
+})
+
+
+def is_pruned(name):
+    return name.startswith('.') or name.lower() in PRUNED_DIRS
+
+
+def has_install_files(names):
+    # names: lowercase names of the files in a folder. Matched like Windows
+    # does, so the scan and is_install agree on any file system.
+    return all(name in names for name in INSTALL_FILES)
+
+
+def is_install(folder):
+    try:
+        with os.scandir(folder) as entries:
+            names = {entry.name.lower() for entry in entries if entry.is_file()}
+    except OSError:
+        return False
+    return has_install_files(names)
+
+
+def candidate_roots(known_folders=()):
+    # [(path, depth)]: every drive (or the home folder outside Windows), the
+    # user's download and desktop folders, and the surroundings of folders
+    # that are already configured
+    home = os.path.expanduser('~')
+    roots = []
+    if os.name == 'nt':
+        roots.extend((f'{letter}:\\', MAX_DEPTH) for letter in string.ascii_uppercase
+                     if os.path.isdir(f'{letter}:\\'))
+    else:
+        roots.append((home, MAX_DEPTH))
+        roots.append(('/opt', MAX_DEPTH))
+    roots.extend((os.path.join(home, name), MAX_DEPTH) for name in ('Desktop', 'Downloads', 'Documents', 'Games'))
+    for folder in known_folders:
+        if folder:
+            roots.append((os.path.dirname(os.path.abspath(folder)), KNOWN_FOLDER_DEPTH))
+    return [(path, depth) for path, depth in roots if os.path.isdir(path)]
+
+
+class InstallIndex:
+    # Persisted result of the last scan: the installations found and, per
+    # visited directory, [mtime_ns, subdirectory names, is install]
+
+    def __init__(self, path=DISCOVERY_INDEX_FILE):
+        self.path = path
+        self.installs = []
+        self.directories = {}
+
+    def load(self):
+        try:
+            with open(self.path, 'r') as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return self
+        if isinstance(data, dict) and data.get('version') == INDEX_VERSION:
+            self.installs = [path for path in data.get('installs', []) if isinstance(path, str)]
+            directories = data.get('directories')
+            self.directories = directories if isinstance(directories, dict) else {}
+        return self
+
+    def save(self):
+        data = {'version': INDEX_VERSION, 'installs': self.installs, 'directories': self.directories}
+        try:
+            atomic_write(self.path, json.dumps(data, separators=(',', ':')).encode('utf-8'))
+        except OSError:
+            pass  # The index is only an optimization
+
+    def cached_installs(self):
+        # Installs from the last scan that are still there; only stats them
+        return [path for path in self.installs if is_install(path)]
+
+
+class DiscoveryResult:
+    __slots__ = ('installs', 'directories', 'listed', 'reused', 'seconds')
+
+    def __init__(self, installs, directories, listed, reused, seconds):
+        self.installs = installs        # Install folders, sorted
+        self.directories = directories  # Directories visited
+        self.listed = listed            # ... of which had to be listed
+        self.reused = reused            # ... of which were unchanged since the last scan
+        self.seconds = seconds
+
+
+def _visit(path, cached):
+    # Runs on a worker: the directory's record, reusing cached when the
+    # directory has not changed. None if it cannot be read.
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+    if cached is not None and cached[0] == mtime_ns:
+        return cached, True
+    subdirs = []
+    files = set()
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.name)
+                    else:
+                        files.add(entry.name.lower())
+                except OSError:
+                    continue
+    except OSError:
+        return None
+    return [mtime_ns, subdirs, has_install_files(files)], False
+
+
+def scan(roots, index, exclude=(), max_workers=DISCOVERY_WORKERS, cancelled=None):
+    # Walk roots ([(path, depth)]) in parallel and update index in place.
+    # Directories in exclude (e.g. the multi-launch instance folders) are
+    # skipped with everything below them. Setting the cancelled event stops
+    # the walk after the directories being listed; the index is left as it
+    # was and None is returned.
+    began = time.perf_counter()
+    previous = index.directories
+    directories = {}
+    installs = []
+    budget = {}  # Normalized path -> deepest remaining depth it was queued with
+    exclude = {path_key(path) for path in exclude}
+    listed = reused = 0
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='discovery') as pool:
+        pending = {}
+
+        def queue(path, depth):
+            path = os.path.abspath(path)
+            key = path_key(path)
+            if key in exclude or budget.get(key, -1) >= depth:
+                return
+            budget[key] = depth
+            pending[pool.submit(_visit, path, previous.get(key))] = (path, key, depth)
+
+        for path, depth in roots:
+            queue(path, depth)
+        while pending:
+            if cancelled is not None and cancelled.is_set():
+                for future in pending:
+                    future.cancel()
+                return None
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                path, key, depth = pending.pop(future)
+                visited = future.result()
+                if visited is None:
+                    continue
+                record, unchanged = visited
+                if unchanged:
+                    reused += 1
+                else:
+                    listed += 1
+                if key not in directories:
+                    directories[key] = record
+                    if record[2]:
+                        installs.append(path)
+                if record[2] or depth <= 0:
+                    continue  # Nothing below an install is another install
+                for name in record[1]:
+                    if not is_pruned(name):
+                        queue(os.path.join(path, name), depth - 1)
+
+    index.directories = directories
+    index.installs = sorted(installs, key=os.path.normcase)
+    return DiscoveryResult(index.installs, len(directories), listed, reused,
+                           round(time.perf_counter() - began, 3))
+
+
+def discover_installs(known_folders=(), exclude=(), index_path=DISCOVERY_INDEX_FILE, on_cached=None,
+                      cancelled=None):
+    # Load the index, report its still-valid installs through on_cached right
+    # away, then rescan and save the index. Returns the DiscoveryResult, or
+    # None when cancelled.
+    index = InstallIndex(index_path).load()
+    if on_cached is not None:
+        on_cached(index.cached_installs())
+    result = scan(candidate_roots(known_folders), index, exclude, cancelled=cancelled)
+    if result is not None:
+        index.save()
+    return result
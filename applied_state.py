@@ -0,0 +1,79 @@
+import hashlib
+import json
+import os
+
+from persistence import atomic_write, read_bytes
+
+APPLIED_STATE_FILE = 'applied_state.json'
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def values_fingerprint(values):
+    # Stable hash of a {(section, tag): value} mapping
+    digest = hashlib.sha256()
+    for (section, tag), value in sorted(values.items()):
+        digest.update(f'{section}/{tag}={value}\n'.encode('utf-8'))
+    return digest.hexdigest()
+
+
+class AppliedStateCache:
+    # Remembers what was last written into a config file (keyed by its path)
+    # together with the file's mtime, size and content hash. As long as the
+    # file on disk still matches, the values recorded here are known to be in
+    # it and do not have to be parsed out again.
+
+    def __init__(self, path=APPLIED_STATE_FILE):
+        self.path = path
+        self.entries = {}
+        self.load()
+
+    def load(self):
+        try:
+            self.entries = json.loads(read_bytes(self.path))
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def save(self):
+        try:
+            atomic_write(self.path, json.dumps(self.entries, indent=4).encode('utf-8'))
+        except OSError:
+            pass  # The cache is only an optimization
+
+    def lookup(self, target_path, stat, read_bytes=None):
+        # Returns the recorded {(section, tag): value} mapping when the file is
+        # unchanged since it was recorded, otherwise None. When only the stat
+        # differs, read_bytes() is used to compare the content hash.
+        entry = self.entries.get(os.path.abspath(target_path))
+        if entry is None:
+            return None
+        if entry['mtime_ns'] != stat.st_mtime_ns or entry['size'] != stat.st_size:
+            if read_bytes is None or entry['size'] != stat.st_size:
+                return None
+            if content_hash(read_bytes()) != entry['sha256']:
+                return None
+            entry['mtime_ns'] = stat.st_mtime_ns  # Touched but identical
+            self.save()
+        return {tuple(key.split('/', 1)): value for key, value in entry['values'].items()}
+
+    def fingerprint(self, target_path):
+        entry = self.entries.get(os.path.abspath(target_path))
+        return entry['fingerprint'] if entry else None
+
+    def record(self, target_path, data, values, stat=None, fingerprint=None):
+        # fingerprint identifies the recorded values, values_fingerprint() by default
+        stat = os.stat(target_path) if stat is None else stat
+        self.entries[os.path.abspath(target_path)] = {
+            'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'sha256': content_hash(data),
+            'fingerprint': fingerprint or values_fingerprint(values),
+            'values': {f'{section}/{tag}': value for (section, tag), value in values.items()},
+        }
+        self.save()
+
+    def forget(self, target_path):
+        if self.entries.pop(os.path.abspath(target_path), None) is not None:
+            self.save()
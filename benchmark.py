@@ -0,0 +1,353 @@
+# Headless benchmarks for the launcher's hot paths.
+#
+#   python benchmark.py                          run all sizes, write benchmark_results.json
+#   python benchmark.py --sizes 10 1000 --repeat 20
+#   python benchmark.py --compare old.json       flag regressions against an earlier run
+#
+# Everything runs in a temporary directory: synthetic settings.json files with
+# 10 to 5000 profiles, an altv.toml, a large GTA V settings.xml (USERPROFILE
+# points into the temp directory) and a stub altv.exe. The window is created
+# on the Qt offscreen platform, so no display is needed.
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+DEFAULT_SIZES = (10, 100, 1000, 5000)
+DEFAULT_REPEAT = 10
+DEFAULT_XML_KB = 512
+DEFAULT_RESULTS_FILE = 'benchmark_results.json'
+REGRESSION_THRESHOLD = 0.10
+RESULTS_VERSION = 1
+IO_TIMEOUT = 30
+
+
+def make_settings_data(count, altv_folder, seed=0):
+    from profiles import BRANCHES
+    from settings_schema import GRAPHICS_SCHEMA
+
+    rng = random.Random(seed)
+    profiles = {}
+    for index in range(count):
+        profiles[f'profile_{index:05d}'] = {
+            'branch': rng.choice(BRANCHES),
+            'debug_mode': rng.random() < 0.5,
+            'graphics_settings': {setting.key: rng.choice(setting.options) for setting in GRAPHICS_SCHEMA},
+        }
+    return {
+        'altv_folder': altv_folder,
+        'last_selected_profile': 'profile_00000',
+        'profiles': profiles,
+    }
+
+
+def make_altv_toml():
+    lines = ['name = "benchmark"', 'debug = false', 'branch = "release"', 'language = "en"', 'useCef = true']
+    for index in range(50):
+        lines.append(f'option{index} = {index}')
+    for table in range(10):
+        lines.append('')
+        lines.append(f'[table{table}]')
+        lines.extend(f'key{index} = "value{index}"' for index in range(20))
+    return ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+def make_settings_xml(size_kb):
+    # A GTA V-like document; filler sections make it as large as requested
+    from settings_schema import XML_SECTIONS
+
+    parts = ['<?xml version="1.0" encoding="UTF-8"?>\n<Settings>\n  <version value="27" />\n']
+    for section in XML_SECTIONS:
+        parts.append(f'  <{section}>\n    <Tessellation value="3" />\n  </{section}>\n')
+    filler = 0
+    while sum(map(len, parts)) < size_kb * 1024:
+        parts.append(f'  <filler{filler}>\n')
+        parts.extend(f'    <Entry{index} value="{index}" />\n' for index in range(100))
+        parts.append(f'  </filler{filler}>\n')
+        filler += 1
+    parts.append('</Settings>\n')
+    return ''.join(parts).encode('utf-8')
+
+
+def make_stub_exe(path):
+    with open(path, 'w') as file:
+        file.write('#!/bin/sh\nexit 0\n')
+    os.chmod(path, 0o755)
+
+
+class Fixture:
+    # Temp directory laid out like a user's machine; the process works inside it
+    def __init__(self, profile_count, xml_kb):
+        self.root = tempfile.mkdtemp(prefix='altv-bench-')
+        self.altv_folder = os.path.join(self.root, 'altv')
+        self.home = os.path.join(self.root, 'home')
+        gta_folder = os.path.join(self.home, 'Documents', 'Rockstar Games', 'GTA V')
+        os.makedirs(self.altv_folder)
+        os.makedirs(gta_folder)
+
+        self.previous_cwd = os.getcwd()
+        self.previous_home = os.environ.get('USERPROFILE')
+        os.environ['USERPROFILE'] = self.home
+        os.chdir(self.root)
+
+        with open('settings.json', 'w') as file:
+            json.dump(make_settings_data(profile_count, self.altv_folder), file, indent=4)
+        with open(os.path.join(self.altv_folder, 'altv.toml'), 'wb') as file:
+            file.write(make_altv_toml())
+        with open(os.path.join(gta_folder, 'settings.xml'), 'wb') as file:
+            file.write(make_settings_xml(xml_kb))
+        make_stub_exe(os.path.join(self.altv_folder, 'altv.exe'))
+
+    def close(self):
+        os.chdir(self.previous_cwd)
+        if self.previous_home is None:
+            os.environ.pop('USERPROFILE', None)
+        else:
+            os.environ['USERPROFILE'] = self.previous_home
+        shutil.rmtree(self.root, ignore_errors=True)
+
+
+def summarize(samples):
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, int(round(0.95 * (len(samples) - 1))))]
+    return {
+        'runs': len(samples),
+        'min_ms': round(samples[0], 4),
+        'median_ms': round(statistics.median(samples), 4),
+        'mean_ms': round(statistics.fmean(samples), 4),
+        'p95_ms': round(p95, 4),
+    }
+
+
+def measure(fn, repeat):
+    # fn(run_index), timed repeat times
+    samples = []
+    for index in range(repeat):
+        start = time.perf_counter()
+        fn(index)
+        samples.append((time.perf_counter() - start) * 1000)
+    return summarize(samples)
+
+
+def wait_until(app, condition, timeout=IO_TIMEOUT):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise TimeoutError('benchmark operation did not finish')
+        app.processEvents()
+        time.sleep(0.0005)
+
+
+def wait_future(future):
+    if future is not None:
+        future.result(IO_TIMEOUT)
+
+
+def run_size(app, profile_count, repeat, xml_kb):
+    import launcher_window
+    from launcher_window import AltVLauncher, read_settings_file
+    from graphics_xml import gta_settings_path
+    from settings_journal import JournaledSettingsWriter
+    from settings_schema import GRAPHICS_SCHEMA
+
+    # Errors would open a modal dialog; fail the benchmark instead
+    def raise_error(self, message):
+        raise RuntimeError(message)
+    launcher_window.AltVLauncher.show_error_message = raise_error
+
+    fixture = Fixture(profile_count, xml_kb)
+    results = {}
+    try:
+        def parse(_):
+            from io_executor import IoExecutor
+            executor = IoExecutor()
+            try:
+                read_settings_file(JournaledSettingsWriter('settings.json', executor))
+            finally:
+                executor.shutdown()
+        results['load_settings'] = measure(parse, repeat)
+
+        windows = []
+
+        def open_window(_):
+            window = AltVLauncher()
+            wait_until(app, lambda: not window.loading_settings)
+            windows.append(window)
+        results['window_ready'] = measure(open_window, max(1, repeat // 2))
+        for window in windows[:-1]:
+            window.close()
+            window.deleteLater()
+        window = windows[-1]
+        app.processEvents()
+
+        names = window.profiles.names()
+
+        def change_profile(index):
+            window.select_profile(names[(index * 7 + 1) % len(names)])
+        results['change_profile'] = measure(change_profile, repeat)
+
+        def apply_selected(index):
+            window.select_profile(names[(index * 7 + 3) % len(names)])
+            wait_future(window.apply_selected_profile())
+        results['apply_selected_profile'] = measure(apply_selected, repeat)
+
+        # Typing into the profile search box; the first query also builds the index
+        queries = ('profile_00', 'pf12', 'branch:dev', 'shadow:very debug:on', 'profile_0001', '')
+        results['filter_profiles'] = measure(
+            lambda index: window.filter_profiles(queries[index % len(queries)]), repeat)
+        window.filter_profiles('')
+
+        def save_settings(index):
+            profile = window.profiles[names[index % len(names)]]
+            profile.debug_mode = not profile.debug_mode
+            window.profiles.mark_dirty(profile.name)
+            window.save_settings()
+            window.write_settings()
+            window.settings_writer.flush(IO_TIMEOUT)
+        results['save_settings'] = measure(save_settings, repeat)
+
+        results['toggle_debug_mode'] = measure(
+            lambda index: wait_future(window.toggle_debug_mode(index % 2 == 0)), repeat)
+        branches = ('release', 'rc', 'dev')
+        results['switch_branch'] = measure(
+            lambda index: wait_future(window.switch_branch(branches[index % len(branches)])), repeat)
+
+        def apply_graphics(index):
+            profile = window.profiles[names[0]]
+            for setting in GRAPHICS_SCHEMA:
+                profile.set_graphics_value(setting.key, setting.options[index % len(setting.options)])
+            wait_future(window.apply_graphics_settings(profile))
+        results['apply_graphics_settings'] = measure(apply_graphics, repeat)
+
+        # launch() up to the point where altv.exe would be spawned
+        ready = []
+        window.launch_ready.disconnect()
+        window.launch_ready.connect(lambda plan, requested_at, started: (ready.append(plan.exe_path),
+                                                                         started.set_result(plan)))
+
+        def launch(index):
+            profile = window.profiles[window.current_profile]
+            profile.debug_mode = index % 2 == 0
+            window.profiles.mark_dirty(profile.name)
+            window.launch()
+            wait_until(app, lambda: len(ready) > index)
+        results['launch_pre_spawn'] = measure(launch, repeat)
+
+        # The same with the launch plan already rendered in the background
+        samples = []
+        for index in range(repeat):
+            profile = window.profiles[window.current_profile]
+            profile.debug_mode = index % 2 == 0
+            window.profiles.mark_dirty(profile.name)
+            window.prepare_launch_plan()
+            wait_until(app, lambda: window.launch_plan is not None)
+            expected = len(ready) + 1
+            start = time.perf_counter()
+            window.launch()
+            wait_until(app, lambda: len(ready) >= expected)
+            samples.append((time.perf_counter() - start) * 1000)
+        results['launch_planned'] = summarize(samples)
+
+        window.close()
+        window.deleteLater()
+        app.processEvents()
+        results['settings_xml_bytes'] = os.path.getsize(gta_settings_path())
+    finally:
+        fixture.close()
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(sizes, repeat, xml_kb):
+    from PyQt5.QtWidgets import QApplication
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    report = {
+        'version': RESULTS_VERSION,
+        'timestamp': time.time(),
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': repeat,
+        'xml_kb': xml_kb,
+        'results': {},
+    }
+    for size in sizes:
+        print(f'profiles={size}', flush=True)
+        size_results = run_size(app, size, repeat, xml_kb)
+        for name, stats in size_results.items():
+            if isinstance(stats, dict):
+                print(f'  {name:<26} median {stats["median_ms"]:>10.3f} ms   p95 {stats["p95_ms"]:>10.3f} ms')
+        report['results'][str(size)] = size_results
+    return report
+
+
+def compare(report, baseline, threshold=REGRESSION_THRESHOLD):
+    # Print median changes against an earlier run; returns the regressions
+    regressions = []
+    for size, results in report['results'].items():
+        old_results = baseline.get('results', {}).get(size, {})
+        for name, stats in results.items():
+            old = old_results.get(name)
+            if not isinstance(stats, dict) or not isinstance(old, dict) or not old.get('median_ms'):
+                continue
+            change = stats['median_ms'] / old['median_ms'] - 1
+            flag = ''
+            if change > threshold:
+                flag = '  REGRESSION'
+                regressions.append((size, name, change))
+            print(f'{size:>6} {name:<26} {old["median_ms"]:>10.3f} -> {stats["median_ms"]:>10.3f} ms '
+                  f'({change:+.1%}){flag}')
+    return regressions
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='Benchmark the alt:V Easy Launch hot paths (headless).')
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES),
+                        help='profile counts of the synthetic settings.json files')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help='runs per measurement')
+    parser.add_argument('--xml-kb', type=int, default=DEFAULT_XML_KB, help='size of the settings.xml fixture')
+    parser.add_argument('--output', default=DEFAULT_RESULTS_FILE, help='where to write the results')
+    parser.add_argument('--compare', metavar='RESULTS', help='earlier results file to compare against')
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help='relative median slowdown reported as a regression')
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    output = os.path.abspath(args.output)
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r') as file:
+            baseline = json.load(file)
+
+    report = run(args.sizes, args.repeat, args.xml_kb)
+    with open(output, 'w') as file:
+        json.dump(report, file, indent=4)
+    print(f'Results written to {output}')
+
+    if baseline is not None:
+        return 1 if compare(report, baseline, args.threshold) else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,203 @@
+# Headless command-line mode. Everything here works on settings.json and the
+# game config files directly and never imports PyQt5, so a desktop shortcut
+# or a test script can launch a known profile without building the window.
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+from altv_discovery import discover_installs
+from applied_state import AppliedStateCache
+from graphics_xml import apply_graphics_settings, gta_settings_path
+from multi_launch import INSTANCES_DIR, format_report, launch_instances, plan_instances
+from paths import ALTV_EXE
+from persistence import SETTINGS_FILE
+from settings_journal import load_settings
+from profiles import ProfileStore
+from startup_profiler import STARTUP_PROFILE_FILE
+from toml_config import TomlTransaction, altv_toml_path, toml_values_for_profile
+
+class CliError(Exception):
+    pass
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='altv-easy-launch', description='alt:V Easy Launch')
+    parser.add_argument('--profile', help='profile to apply or launch (defaults to the last selected one)')
+    parser.add_argument('--settings', default=SETTINGS_FILE, help='path to settings.json')
+    parser.add_argument('--altv-folder', help='override the alt:V folder stored in settings.json')
+    parser.add_argument('--profile-startup', nargs='?', const=STARTUP_PROFILE_FILE, metavar='REPORT',
+                        help='record startup phase timings of the window into a JSON report')
+    parser.add_argument('--metrics-log', metavar='PATH',
+                        help='append one JSON line per measured operation (save, launch, ...) to PATH')
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--list', action='store_true', help='list stored profiles and exit')
+    mode.add_argument('--launch', action='store_true', help='apply the profile and start altv.exe')
+    mode.add_argument('--apply-only', action='store_true', help='apply the profile without starting altv.exe')
+    mode.add_argument('--find-altv', action='store_true', help='list the alt:V installations found on disk and exit')
+    mode.add_argument('--multi-launch', nargs='+', metavar='PROFILE',
+                      help='start clients for several profiles at once, each from its own instance folder')
+    parser.add_argument('--instances', type=int, default=1, metavar='N',
+                        help='clients per profile for --multi-launch (default 1)')
+    parser.add_argument('--instances-dir', default=INSTANCES_DIR,
+                        help=f'folder for the instance folders of --multi-launch (default {INSTANCES_DIR})')
+    parser.add_argument('--report', metavar='PATH', help='write the --multi-launch throughput report as JSON')
+    parser.add_argument('--new-instance', action='store_true',
+                        help='do not hand the request to an already running launcher window')
+    return parser
+
+
+def is_cli_request(args):
+    return args.list or args.launch or args.apply_only or args.find_altv or bool(args.multi_launch)
+
+
+def attach_console():
+    # The shipped exe is a windowed build whose std streams are None; when it
+    # was started from a console, print into that console
+    if os.name != 'nt' or (sys.stdout is not None and sys.stderr is not None):
+        return
+    import ctypes
+    ATTACH_PARENT_PROCESS = -1
+    if not ctypes.windll.kernel32.AttachConsole(ATTACH_PARENT_PROCESS):
+        return  # Not started from a console, nobody would see the output
+    if sys.stdout is None:
+        sys.stdout = open('CONOUT$', 'w', buffering=1)
+    if sys.stderr is None:
+        sys.stderr = open('CONOUT$', 'w', buffering=1)
+
+
+def load_settings_data(path):
+    try:
+        data = load_settings(path)
+    except ValueError as e:
+        raise CliError(f'Failed to read {path}: {e}')
+    if data is None:
+        raise CliError(f'{path} not found.')
+    return data
+
+
+def start_client(exe_path, output_path=None):
+    # Start altv.exe directly, detached from this process and without a shell.
+    # With output_path its stdout and stderr go to that file.
+    kwargs = {}
+    if os.name == 'nt':
+        kwargs['creationflags'] = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+    else:
+        kwargs['start_new_session'] = True
+    if output_path is None:
+        return subprocess.Popen([exe_path], cwd=os.path.dirname(exe_path), close_fds=True, **kwargs)
+    with open(output_path, 'wb') as output:
+        return subprocess.Popen([exe_path], cwd=os.path.dirname(exe_path), close_fds=True,
+                                stdout=output, stderr=subprocess.STDOUT, **kwargs)
+
+
+def list_profiles(data, profiles):
+    last_profile = data.get('last_selected_profile')
+    for name in profiles:
+        profile = profiles[name]
+        marker = '*' if name == last_profile else ' '
+        debug = ' debug' if profile.debug_mode else ''
+        print(f'{marker} {name} ({profile.branch.label}{debug})')
+
+
+def apply_profile(altv_folder, profile):
+    TomlTransaction(altv_toml_path(altv_folder)).set_many(toml_values_for_profile(profile)).commit()
+
+    settings_path = gta_settings_path()
+    if not os.path.exists(settings_path):
+        print('warning: GTA V settings.xml not found in Documents, graphics settings not applied.', file=sys.stderr)
+        return
+    apply_graphics_settings(settings_path, profile, AppliedStateCache())
+
+
+def profile_altv_folder(args, data, profile):
+    # --altv-folder, then the profile's own folder, then the global one
+    altv_folder = args.altv_folder or profile.altv_folder or data.get('altv_folder', '')
+    if not altv_folder:
+        raise CliError(f'alt:V folder path is empty for profile "{profile.name}".')
+    return altv_folder
+
+
+def find_altv(args, data, profiles):
+    known_folders = [args.altv_folder, data.get('altv_folder')] + [profiles[name].altv_folder for name in profiles]
+    result = discover_installs(known_folders, [args.instances_dir])
+    for folder in result.installs:
+        print(folder)
+    print(f'{len(result.installs)} installations, {result.directories} directories searched in '
+          f'{result.seconds:.2f} s ({result.reused} unchanged since the last search)', file=sys.stderr)
+    return 0
+
+
+def multi_launch(args, data, profiles):
+    if args.instances < 1:
+        raise CliError('--instances must be at least 1.')
+    selection = []
+    for name in args.multi_launch:
+        if name not in profiles:
+            raise CliError(f'Profile "{name}" does not exist.')
+        selection.append((profiles[name], profile_altv_folder(args, data, profiles[name])))
+
+    settings_path = gta_settings_path()
+    if os.path.exists(settings_path):
+        # settings.xml exists once per user, so the first profile's graphics apply to all clients
+        apply_graphics_settings(settings_path, selection[0][0], AppliedStateCache())
+
+    jobs = plan_instances(selection, args.instances, args.instances_dir)
+    report = launch_instances(jobs, lambda job: start_client(job.exe_path, job.output_path).pid)
+    for client in report['clients']:
+        status = f'pid {client["pid"]}' if client['pid'] is not None else 'not started'
+        print(f'{client["name"]}: {status} ({client["directory"]})')
+    for error in report['failed']:
+        print(f'error: {error}', file=sys.stderr)
+    print(format_report(report))
+    if args.report:
+        with open(args.report, 'w') as file:
+            json.dump(report, file, indent=4)
+    return 0 if not report['failed'] else 1
+
+
+def run_cli(args):
+    try:
+        if args.find_altv:
+            # Works without settings.json, configured folders only widen the search
+            data = load_settings(args.settings) or {}
+            profiles = ProfileStore()
+            profiles.load(data.get('profiles', {}), data.get('graphics_presets'))
+            return find_altv(args, data, profiles)
+
+        data = load_settings_data(args.settings)
+        profiles = ProfileStore()
+        profiles.load(data.get('profiles', {}), data.get('graphics_presets'))
+        for name in profiles.unresolved:
+            print(f'warning: The graphics preset of profile "{name}" is missing from settings.json, '
+                  'using the default graphics settings.', file=sys.stderr)
+
+        if args.list:
+            list_profiles(data, profiles)
+            return 0
+        if args.multi_launch:
+            return multi_launch(args, data, profiles)
+
+        profile_name = args.profile or data.get('last_selected_profile')
+        if not profile_name:
+            raise CliError('No profile selected.')
+        if profile_name not in profiles:
+            raise CliError(f'Profile "{profile_name}" does not exist.')
+        altv_folder = profile_altv_folder(args, data, profiles[profile_name])
+
+        exe_path = os.path.join(altv_folder, ALTV_EXE)
+        if args.launch and not os.path.exists(exe_path):
+            raise CliError('altv.exe not found in the specified folder.')
+
+        apply_profile(altv_folder, profiles[profile_name])
+        if args.launch:
+            process = start_client(exe_path)
+            print(f'Started {exe_path} (pid {process.pid}) with profile "{profile_name}".')
+        else:
+            print(f'Applied profile "{profile_name}".')
+        return 0
+    except (CliError, OSError, ValueError) as e:
+        print(f'error: {e}', file=sys.stderr)
+        return 1
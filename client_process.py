@@ -0,0 +1,241 @@
+# Non-blocking, monitored client launch. altv.exe is started directly (no
+# shell) as a detached process so it keeps running when the launcher is
+# closed; its stdout/stderr are appended to a log file that is tailed into a
+# bounded in-memory buffer, and a watcher thread reports the exit status. The client
+# counts as ready once it has written output or, on Windows, shown a window.
+
+import os
+import threading
+import time
+from collections import deque
+
+from PyQt5.QtCore import QObject, QProcess, QTimer, pyqtSignal
+
+CLIENT_OUTPUT_FILE = 'client_output.log'
+CLIENT_OUTPUT_MAX_BYTES = 16 * 1024 * 1024  # The log starts over at the next launch once it is this large
+OUTPUT_BUFFER_LINES = 2000
+OUTPUT_POLL_MS = 500
+READY_POLL_MS = 100  # Polling is faster until the client is ready, for a finer launch-to-ready time
+HISTORY_SIZE = 50
+
+
+def wait_for_exit(pid):
+    # Blocks until the process is gone. Returns its exit code where the
+    # platform can tell us (Windows), otherwise None.
+    if os.name == 'nt':
+        import ctypes
+        from ctypes import wintypes
+
+        SYNCHRONIZE = 0x00100000
+        PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+        INFINITE = 0xFFFFFFFF
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(SYNCHRONIZE | PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+        if not handle:
+            return None
+        try:
+            kernel32.WaitForSingleObject(handle, INFINITE)
+            exit_code = wintypes.DWORD()
+            if kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code)):
+                return exit_code.value
+            return None
+        finally:
+            kernel32.CloseHandle(handle)
+
+    # A detached process is not our child, so all we can do is poll for it
+    while _pid_alive(pid):
+        time.sleep(0.5)
+    return None
+
+
+def has_visible_window(pid):
+    # Whether pid owns a visible top-level window; always False outside Windows
+    if os.name != 'nt':
+        return False
+    import ctypes
+    from ctypes import wintypes
+
+    user32 = ctypes.windll.user32
+    found = []
+    owner = wintypes.DWORD()
+
+    @ctypes.WINFUNCTYPE(wintypes.BOOL, wintypes.HWND, wintypes.LPARAM)
+    def visit(hwnd, _):
+        user32.GetWindowThreadProcessId(hwnd, ctypes.byref(owner))
+        if owner.value == pid and user32.IsWindowVisible(hwnd):
+            found.append(hwnd)
+            return False
+        return True
+
+    user32.EnumWindows(visit, 0)
+    return bool(found)
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    try:
+        with open(f'/proc/{pid}/stat', 'r') as file:
+            # Exited but not reaped yet
+            return file.read().rsplit(')', 1)[1].split()[0] != 'Z'
+    except (OSError, IndexError):
+        return True
+
+
+class ClientProcess(QObject):
+    # One launched client: PID, lifetime, exit status and recent output
+    finished = pyqtSignal(object)  # exit code, None if unknown
+    output_received = pyqtSignal(str)
+    ready = pyqtSignal()
+    _exited = pyqtSignal(object)
+
+    def __init__(self, exe_path, output_path=CLIENT_OUTPUT_FILE, max_lines=OUTPUT_BUFFER_LINES, parent=None):
+        super().__init__(parent)
+        self.exe_path = exe_path
+        self.output_path = os.path.abspath(output_path)
+        self.output = deque(maxlen=max_lines)
+        self.pid = None
+        self.requested_at = None
+        self.started_at = None
+        self.finished_at = None
+        self.spawn_latency_ms = None
+        self.ready_latency_ms = None  # Click to first output or window
+        self.exit_code = None
+        self.running = False
+
+        self._output_offset = 0
+        self._partial_line = b''
+        self._output_timer = QTimer(self)
+        self._output_timer.setInterval(READY_POLL_MS)
+        self._output_timer.timeout.connect(self.poll)
+        self._exited.connect(self._on_exited)
+
+    def start(self, requested_at=None, arguments=()):
+        # requested_at: time.perf_counter() of the click, for click-to-spawn latency
+        self.requested_at = time.perf_counter() if requested_at is None else requested_at
+
+        process = QProcess()
+        process.setProgram(self.exe_path)
+        process.setArguments(list(arguments))
+        process.setWorkingDirectory(os.path.dirname(self.exe_path))
+        # Earlier launches' output is kept, only what follows it is tailed
+        try:
+            output_offset = os.path.getsize(self.output_path)
+        except OSError:
+            output_offset = 0
+        if output_offset >= CLIENT_OUTPUT_MAX_BYTES:
+            output_offset = 0
+            process.setStandardOutputFile(self.output_path, QProcess.Truncate)
+        else:
+            process.setStandardOutputFile(self.output_path, QProcess.Append)
+        process.setStandardErrorFile(self.output_path, QProcess.Append)
+        ok, pid = process.startDetached()
+        if not ok:
+            raise OSError(f'Failed to start {self.exe_path}')
+        self.attach(pid, self.requested_at, output_offset=output_offset)
+
+    def attach(self, pid, requested_at=None, spawned_at=None, output_offset=0):
+        # Monitor a client that was started elsewhere (e.g. by a worker thread);
+        # its output starts at output_offset in the log
+        now = time.perf_counter()
+        self.requested_at = now if requested_at is None else requested_at
+        self.pid = pid
+        self.started_at = time.time()
+        self.spawn_latency_ms = round(((spawned_at or now) - self.requested_at) * 1000, 3)
+        self.running = True
+        self._output_offset = output_offset
+        self._output_timer.setInterval(READY_POLL_MS)
+        self._output_timer.start()
+
+        threading.Thread(target=lambda: self._exited.emit(wait_for_exit(pid)),
+                         name=f'client-{pid}-watcher', daemon=True).start()
+
+    def poll(self):
+        has_output = self.read_output()
+        if self.ready_latency_ms is None and (has_output or has_visible_window(self.pid)):
+            self.ready_latency_ms = round((time.perf_counter() - self.requested_at) * 1000, 3)
+            self._output_timer.setInterval(OUTPUT_POLL_MS)
+            self.ready.emit()
+
+    def read_output(self):
+        # Returns whether new output arrived
+        try:
+            with open(self.output_path, 'rb') as file:
+                file.seek(self._output_offset)
+                data = file.read()
+        except OSError:
+            return False
+        if not data:
+            return False
+        self._output_offset += len(data)
+        lines = (self._partial_line + data).split(b'\n')
+        self._partial_line = lines.pop()
+        for line in lines:
+            text = line.rstrip(b'\r').decode('utf-8', errors='replace')
+            self.output.append(text)
+            self.output_received.emit(text)
+        return True
+
+    def _on_exited(self, exit_code):
+        self._output_timer.stop()
+        self.read_output()
+        self.running = False
+        self.exit_code = exit_code
+        self.finished_at = time.time()
+        self.finished.emit(exit_code)
+
+    @property
+    def lifetime(self):
+        if self.started_at is None:
+            return None
+        return (self.finished_at or time.time()) - self.started_at
+
+    def stats(self):
+        return {
+            'exe_path': self.exe_path,
+            'pid': self.pid,
+            'running': self.running,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'lifetime_s': self.lifetime,
+            'spawn_latency_ms': self.spawn_latency_ms,
+            'ready_latency_ms': self.ready_latency_ms,
+            'exit_code': self.exit_code,
+        }
+
+
+class ProcessManager(QObject):
+    client_started = pyqtSignal(object)
+    client_finished = pyqtSignal(object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.clients = []  # Still running
+        self.history = deque(maxlen=HISTORY_SIZE)  # stats() of finished clients
+
+    def launch(self, exe_path, requested_at=None, output_path=CLIENT_OUTPUT_FILE):
+        client = ClientProcess(exe_path, output_path, parent=self)
+        client.start(requested_at)
+        return self._track(client)
+
+    def adopt(self, exe_path, pid, requested_at=None, spawned_at=None, output_path=CLIENT_OUTPUT_FILE):
+        client = ClientProcess(exe_path, output_path, parent=self)
+        client.attach(pid, requested_at, spawned_at)
+        return self._track(client)
+
+    def _track(self, client):
+        client.finished.connect(lambda exit_code, client=client: self._on_finished(client))
+        self.clients.append(client)
+        self.client_started.emit(client)
+        return client
+
+    def _on_finished(self, client):
+        if client in self.clients:
+            self.clients.remove(client)
+        self.history.append(client.stats())
+        self.client_finished.emit(client)
+        client.deleteLater()
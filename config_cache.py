@@ -0,0 +1,95 @@
+import os
+import threading
+from collections import namedtuple
+
+from paths import path_key
+from persistence import read_bytes
+
+FileStat = namedtuple('FileStat', ['st_mtime_ns', 'st_size'])
+
+
+class _Entry:
+    __slots__ = ('data', 'stat', 'parsed')
+
+    def __init__(self, data, stat):
+        self.data = data      # None when the file does not exist
+        self.stat = stat
+        self.parsed = {}      # parser -> parsed form of data
+
+
+def file_stat(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return FileStat(stat.st_mtime_ns, stat.st_size)
+
+
+class ConfigFileCache:
+    # In-memory copies of the config files the launcher patches (altv.toml,
+    # settings.xml). Entries are trusted until invalidate() is called, which
+    # the file watcher does when something else touches a file, so reads and
+    # existence checks are memory lookups. Safe to use from I/O threads.
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _entry(self, path):
+        key = path_key(path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        stat = file_stat(path)
+        data = None
+        if stat is not None:
+            try:
+                data = read_bytes(path)
+            except FileNotFoundError:
+                stat = None
+        entry = _Entry(data, stat)
+        with self._lock:
+            self._entries[key] = entry
+        return entry
+
+    def read(self, path):
+        # File content as bytes, or None if it does not exist
+        return self._entry(path).data
+
+    def exists(self, path):
+        return self._entry(path).data is not None
+
+    def stat(self, path):
+        return self._entry(path).stat
+
+    def parsed(self, path, parser):
+        # parser(data) computed once per cached version of the file
+        entry = self._entry(path)
+        if entry.data is None:
+            return None
+        result = entry.parsed.get(parser)
+        if result is None:
+            result = entry.parsed[parser] = parser(entry.data)
+        return result
+
+    def store(self, path, data):
+        # Record what we just wrote ourselves, so it does not count as an external change
+        entry = _Entry(data, file_stat(path))
+        with self._lock:
+            self._entries[path_key(path)] = entry
+
+    def invalidate(self, path):
+        with self._lock:
+            self._entries.pop(path_key(path), None)
+
+    def is_current(self, path):
+        # True when the cached copy (if any) still matches the file on disk
+        with self._lock:
+            entry = self._entries.get(path_key(path))
+        return entry is None or entry.stat == file_stat(path)
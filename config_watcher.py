@@ -0,0 +1,58 @@
+import os
+
+from PyQt5.QtCore import QFileSystemWatcher, QObject, pyqtSignal
+
+
+class ConfigFileWatcher(QObject):
+    # Watches the files held in a ConfigFileCache and drops their cached copy
+    # when something other than the launcher changes them (the game, the
+    # alt:V updater, a text editor). Our own atomic writes replace the file,
+    # which also fires the watcher; those are recognised because the cache
+    # already holds the new mtime and size.
+    file_changed = pyqtSignal(str)
+
+    def __init__(self, cache, parent=None):
+        super().__init__(parent)
+        self.cache = cache
+        self.paths = set()
+        self.external_changes = 0
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.fileChanged.connect(self._on_changed)
+        self._watcher.directoryChanged.connect(self._on_directory_changed)
+
+    def set_paths(self, paths):
+        paths = {os.path.abspath(path) for path in paths if path}
+        for path in self.paths - paths:
+            self.cache.invalidate(path)
+        self.paths = paths
+
+        watched = self._watcher.files() + self._watcher.directories()
+        if watched:
+            self._watcher.removePaths(watched)
+        # Directories are watched too, so a file that is missing now (or is
+        # replaced by a rename) is picked up when it appears
+        directories = {os.path.dirname(path) for path in paths}
+        self._watch([path for path in sorted(paths | directories) if os.path.exists(path)])
+
+    def _watch(self, paths):
+        if paths:
+            self._watcher.addPaths(paths)
+
+    def _on_directory_changed(self, directory):
+        directory = os.path.abspath(directory)
+        for path in self.paths:
+            if os.path.dirname(path) == directory:
+                self._on_changed(path)
+
+    def _on_changed(self, path):
+        path = os.path.abspath(path)
+        if path not in self.paths:
+            return
+        # A rename over the file drops it from the watch list
+        if os.path.exists(path) and path not in self._watcher.files():
+            self._watch([path])
+        if self.cache.is_current(path):
+            return
+        self.cache.invalidate(path)
+        self.external_changes += 1
+        self.file_changed.emit(path)
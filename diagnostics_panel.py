@@ -0,0 +1,158 @@
+# Diagnostics window: per-operation calls, bytes and latencies collected by
+# metrics, the I/O per file and the latency histogram of the selected
+# operation. It refreshes itself while open and can export a snapshot as
+# JSON lines.
+
+from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtGui import QFont
+from PyQt5.QtWidgets import (
+    QAbstractItemView, QDialog, QFileDialog, QHBoxLayout, QHeaderView, QLabel, QPlainTextEdit, QPushButton,
+    QTableWidget, QTableWidgetItem, QVBoxLayout
+)
+
+from metrics import BUCKET_BOUNDS_MS
+
+DIAGNOSTICS_REFRESH_MS = 1000
+HISTOGRAM_WIDTH = 40  # Characters of the longest histogram bar
+OPERATION_COLUMNS = ('Operation', 'Calls', 'Errors', 'Read', 'Written', 'Mean ms', 'p50 ms', 'p95 ms',
+                     'p99 ms', 'Max ms')
+FILE_COLUMNS = ('File', 'Reads', 'Read', 'Writes', 'Written')
+
+
+def format_bytes(count):
+    for unit in ('B', 'KiB', 'MiB'):
+        if count < 1024 or unit == 'MiB':
+            return f'{count:.0f} {unit}' if unit == 'B' else f'{count:.1f} {unit}'
+        count /= 1024
+
+
+def format_ms(value):
+    return '' if value is None else f'{value:.2f}'
+
+
+def format_histogram(name, stats):
+    lines = [f'{name}: last {stats["samples"]} of {stats["calls"]} calls']
+    largest = max(stats['buckets']) or 1
+    lower = 0
+    for bound, count in zip(BUCKET_BOUNDS_MS + (None,), stats['buckets']):
+        label = f'{lower:g}-{bound:g} ms' if bound is not None else f'> {lower:g} ms'
+        lines.append(f'{label:>16} {"#" * round(count / largest * HISTOGRAM_WIDTH):<{HISTOGRAM_WIDTH}} {count}')
+        lower = bound
+    return '\n'.join(lines)
+
+
+class DiagnosticsDialog(QDialog):
+    def __init__(self, metrics, counters=None, parent=None):
+        # counters: callable returning extra {label: value} pairs to show
+        super().__init__(parent)
+        self.metrics = metrics
+        self.counters = counters
+        self.snapshot = None
+        self.setWindowTitle('Diagnostics')
+        self.resize(900, 600)
+
+        layout = QVBoxLayout()
+        self.summary_label = QLabel(self)
+        layout.addWidget(self.summary_label)
+        self.operation_table = self.create_table(OPERATION_COLUMNS)
+        self.operation_table.itemSelectionChanged.connect(self.show_histogram)
+        layout.addWidget(self.operation_table, 3)
+        self.file_table = self.create_table(FILE_COLUMNS)
+        layout.addWidget(self.file_table, 2)
+        self.histogram_view = QPlainTextEdit(self)
+        self.histogram_view.setReadOnly(True)
+        self.histogram_view.setFont(QFont('Courier New'))
+        layout.addWidget(self.histogram_view, 2)
+
+        button_layout = QHBoxLayout()
+        reset_btn = QPushButton('Reset', self)
+        reset_btn.setToolTip('Start counting from zero.')
+        reset_btn.clicked.connect(self.reset)
+        export_btn = QPushButton('Export...', self)
+        export_btn.setToolTip('Save the current numbers as JSON lines.')
+        export_btn.clicked.connect(self.export)
+        close_btn = QPushButton('Close', self)
+        close_btn.clicked.connect(self.close)
+        button_layout.addWidget(reset_btn)
+        button_layout.addWidget(export_btn)
+        button_layout.addStretch()
+        button_layout.addWidget(close_btn)
+        layout.addLayout(button_layout)
+        self.setLayout(layout)
+
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(DIAGNOSTICS_REFRESH_MS)
+        self.refresh_timer.timeout.connect(self.refresh)
+
+    def create_table(self, columns):
+        table = QTableWidget(0, len(columns), self)
+        table.setHorizontalHeaderLabels(columns)
+        table.verticalHeader().setVisible(False)
+        table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        table.setSelectionMode(QAbstractItemView.SingleSelection)
+        table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        return table
+
+    def fill_table(self, table, rows):
+        table.setRowCount(len(rows))
+        for row, values in enumerate(rows):
+            for column, value in enumerate(values):
+                item = table.item(row, column)
+                if item is None:
+                    item = QTableWidgetItem()
+                    if column:
+                        item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                    table.setItem(row, column, item)
+                item.setText(str(value))
+
+    def showEvent(self, event):
+        self.refresh()
+        self.refresh_timer.start()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self.refresh_timer.stop()
+        super().hideEvent(event)
+
+    def refresh(self):
+        self.snapshot = self.metrics.snapshot()
+        operations = self.snapshot['operations']
+        files = self.snapshot['files']
+        self.fill_table(self.operation_table, [
+            (name, stats['calls'], stats['errors'], format_bytes(stats['bytes_read']),
+             format_bytes(stats['bytes_written']), format_ms(stats['mean_ms']), format_ms(stats['p50_ms']),
+             format_ms(stats['p95_ms']), format_ms(stats['p99_ms']), format_ms(stats['max_ms']))
+            for name, stats in operations.items()])
+        self.fill_table(self.file_table, [
+            (name, totals['reads'], format_bytes(totals['bytes_read']), totals['writes'],
+             format_bytes(totals['bytes_written']))
+            for name, totals in files.items()])
+
+        summary = [f'Collected over {self.snapshot["uptime_s"]:.0f} s',
+                   f'{format_bytes(sum(totals["bytes_written"] for totals in files.values()))} written',
+                   f'{format_bytes(sum(totals["bytes_read"] for totals in files.values()))} read']
+        if self.counters is not None:
+            summary.extend(f'{label}: {value}' for label, value in self.counters().items())
+        self.summary_label.setText(', '.join(summary))
+        self.show_histogram()
+
+    def show_histogram(self):
+        row = self.operation_table.currentRow()
+        item = self.operation_table.item(row, 0) if row >= 0 else None
+        stats = self.snapshot['operations'].get(item.text()) if item is not None and self.snapshot else None
+        self.histogram_view.setPlainText(format_histogram(item.text(), stats) if stats else
+                                         'Select an operation to see its latency histogram.')
+
+    def reset(self):
+        self.metrics.reset()
+        self.refresh()
+
+    def export(self):
+        path, _ = QFileDialog.getSaveFileName(self, 'Export Diagnostics', 'metrics.jsonl',
+                                              'JSON Lines (*.jsonl)')
+        if path:
+            try:
+                self.metrics.export_jsonl(path)
+            except OSError as e:
+                self.parent().show_error_message(f'Failed to export diagnostics: {e}')
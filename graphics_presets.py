@@ -0,0 +1,95 @@
+# Graphics configurations shared between profiles. A configuration is the
+# profile's row of option codes; it is addressed by a short hash of its
+# setting values, so identical configurations are stored once in
+# settings.json. Named presets are mutable: every profile linked to one
+# shares the same code array, so editing the preset changes all of them
+# without touching the profiles themselves.
+
+import hashlib
+
+from settings_schema import GRAPHICS_SCHEMA
+
+PRESET_ID_PREFIX = '#'
+PRESET_ID_LENGTH = 16
+
+_preset_ids = {}  # bytes(codes) -> preset id
+
+
+def preset_id(graphics):
+    # Content address of a code array, memoized so repeated lookups are O(1).
+    # Hashes setting keys and values rather than raw codes, so ids survive
+    # options being reordered in the schema.
+    key = bytes(graphics)
+    result = _preset_ids.get(key)
+    if result is None:
+        digest = hashlib.sha256()
+        for setting, code in zip(GRAPHICS_SCHEMA, key):
+            digest.update(f'{setting.key}={setting.options[code]}\n'.encode('utf-8'))
+        result = _preset_ids[key] = PRESET_ID_PREFIX + digest.hexdigest()[:PRESET_ID_LENGTH]
+    return result
+
+
+def is_preset_id(reference):
+    return isinstance(reference, str) and reference.startswith(PRESET_ID_PREFIX)
+
+
+def encode_graphics(graphics):
+    return {setting.key: setting.options[code] for setting, code in zip(GRAPHICS_SCHEMA, graphics)}
+
+
+def decode_graphics(values, graphics=None):
+    # Option codes for a {setting: value} dict; unknown entries keep the code
+    # they have in graphics (the defaults when it is None)
+    graphics = bytearray(len(GRAPHICS_SCHEMA)) if graphics is None else bytearray(graphics)
+    if isinstance(values, dict):
+        for index, setting in enumerate(GRAPHICS_SCHEMA):
+            code = setting.codes.get(values.get(setting.key))
+            if code is not None:
+                graphics[index] = code
+    return graphics
+
+
+class GraphicsPresets:
+    def __init__(self):
+        self.named = {}     # name -> code array shared by every linked profile
+        self.unnamed = {}   # preset id -> codes, as read from settings.json
+
+    def load(self, presets_data):
+        self.named = {}
+        self.unnamed = {}
+        if isinstance(presets_data, dict):
+            for reference, values in presets_data.items():
+                graphics = bytes(decode_graphics(values))
+                if is_preset_id(reference):
+                    self.unnamed[reference] = graphics
+                else:
+                    self.named[reference] = bytearray(graphics)
+
+    def resolve(self, reference):
+        # (graphics, name) for a profile's preset reference, None if unknown.
+        # Named presets return the shared array itself.
+        if reference in self.named:
+            return self.named[reference], reference
+        graphics = self.unnamed.get(reference)
+        if graphics is not None:
+            return bytearray(graphics), None
+        return None
+
+    def names(self):
+        return sorted(self.named)
+
+    def create(self, name, graphics):
+        if not name or is_preset_id(name):
+            raise ValueError(f'invalid preset name "{name}"')
+        if name in self.named:
+            raise ValueError(f'preset "{name}" already exists')
+        self.named[name] = bytearray(graphics)
+        return self.named[name]
+
+    def to_dict(self, references):
+        # Named presets plus the content-addressed ones in references
+        # ({preset id: codes}); unused unnamed presets are dropped
+        presets = {name: encode_graphics(graphics) for name, graphics in sorted(self.named.items())}
+        for reference, graphics in sorted(references.items()):
+            presets[reference] = encode_graphics(graphics)
+        return presets
@@ -0,0 +1,191 @@
+import os
+import re
+
+from graphics_presets import preset_id
+from metrics import metrics
+from persistence import atomic_write, read_bytes as read_file
+from settings_schema import GRAPHICS_SCHEMA, XML_SECTIONS
+
+
+def gta_settings_path():
+    # Get the path to the GTA 5 settings.xml file
+    return os.path.join(os.environ['USERPROFILE'], 'Documents', 'Rockstar Games', 'GTA V', 'settings.xml')
+
+
+def xml_values_for_profile(profile):
+    # {(section, tag): value} for everything a profile controls in settings.xml
+    values = {}
+    for setting, code in zip(GRAPHICS_SCHEMA, profile.graphics):
+        values.update(setting.encoded[code])
+    return values
+
+
+# Tokens of an XML document: comments, processing instructions, CDATA and
+# doctypes are matched as a whole so nothing inside them is mistaken for an
+# element. Group 1 is "/" for end tags, 2 the name, 3 the attributes and 4
+# "/" for self-closing tags.
+_TOKEN_RE = re.compile(
+    rb'<!--.*?-->|<\?.*?\?>|<!\[CDATA\[.*?\]\]>|<![^>]*>'
+    rb'|<(/?)([A-Za-z_][\w.:-]*)((?:[^>"\']|"[^"]*"|\'[^\']*\')*?)(/?)>',
+    re.S
+)
+_VALUE_RE = re.compile(rb'\bvalue\s*=\s*(["\'])(.*?)\1', re.S)
+_SPACE_RE = re.compile(rb'\s*$')
+
+
+def _escape_attribute(value):
+    return (value.replace('&', '&amp;').replace('<', '&lt;')
+            .replace('>', '&gt;').replace('"', '&quot;').encode('utf-8'))
+
+
+class _Section:
+    __slots__ = ('children', 'child_indent', 'close_offset')
+
+    def __init__(self):
+        self.children = {}      # tag -> (start, end, has_value) of the value text or attribute insert point
+        self.child_indent = b''
+        self.close_offset = None
+
+
+class SettingsXmlIndex:
+    # Single pass over settings.xml that records where the value attributes of
+    # the children of the schema's sections (<graphics>, <video>) live. splice() then rewrites only those
+    # byte ranges and leaves the rest of the document (formatting, comments,
+    # unknown keys) exactly as it was.
+
+    def __init__(self, data, sections=XML_SECTIONS):
+        self.data = data
+        self.sections = {}
+        wanted = {name.encode('ascii') for name in sections}
+
+        depth = 0
+        section = None
+        previous_end = 0
+        for match in _TOKEN_RE.finditer(data):
+            name = match.group(2)
+            if name is None:
+                previous_end = match.end()
+                continue
+            closing = match.group(1) == b'/'
+            self_closing = match.group(4) == b'/'
+            if closing:
+                depth -= 1
+                if section is not None and depth == 1:
+                    gap = data[previous_end:match.start()]
+                    section.close_offset = previous_end + _SPACE_RE.search(gap).start()
+                    section = None
+            else:
+                if depth == 1 and name in wanted and not self_closing and name.decode() not in self.sections:
+                    section = self.sections[name.decode()] = _Section()
+                elif depth == 2 and section is not None:
+                    tag = name.decode()
+                    if not section.children:
+                        gap = data[previous_end:match.start()]
+                        section.child_indent = gap[_SPACE_RE.search(gap).start():]
+                    if tag not in section.children:
+                        attributes_start = match.start(3)
+                        value = _VALUE_RE.search(match.group(3))
+                        if value:
+                            section.children[tag] = (attributes_start + value.start(2), attributes_start + value.end(2), True)
+                        else:
+                            insert_at = attributes_start + len(match.group(3).rstrip())
+                            section.children[tag] = (insert_at, insert_at, False)
+                if not self_closing:
+                    depth += 1
+            previous_end = match.end()
+
+        if depth != 0 or previous_end == 0:
+            raise ValueError('settings.xml is not a well-formed document')
+
+    def splice(self, values):
+        # values: {(section, tag): value}. Values for sections the document does
+        # not have are skipped; missing elements are appended to their section.
+        edits = []
+        appended = {}
+        for (section_name, tag), value in values.items():
+            section = self.sections.get(section_name)
+            if section is None or section.close_offset is None:
+                continue
+            encoded = _escape_attribute(value)
+            child = section.children.get(tag)
+            if child is None:
+                appended.setdefault(section_name, []).append(
+                    section.child_indent + b'<' + tag.encode('ascii') + b' value="' + encoded + b'" />')
+            elif child[2]:
+                if self.data[child[0]:child[1]] != encoded:
+                    edits.append((child[0], child[1], encoded))
+            else:
+                edits.append((child[0], child[1], b' value="' + encoded + b'"'))
+        for section_name, elements in appended.items():
+            offset = self.sections[section_name].close_offset
+            edits.append((offset, offset, b''.join(elements)))
+
+        if not edits:
+            return self.data
+        edits.sort(key=lambda edit: edit[0])
+        pieces = []
+        position = 0
+        for start, end, replacement in edits:
+            pieces.append(self.data[position:start])
+            pieces.append(replacement)
+            position = end
+        pieces.append(self.data[position:])
+        return b''.join(pieces)
+
+
+def write_xml_values(data, values):
+    return SettingsXmlIndex(data).splice(values)
+
+
+@metrics.timed('apply_graphics_settings')
+def apply_graphics_settings(settings_path, profile, cache=None, files=None):
+    # Write the profile's graphics settings into settings.xml. With an
+    # AppliedStateCache, a file that still holds what we wrote last time is
+    # neither parsed nor rewritten, and only values that differ are touched.
+    # With a ConfigFileCache the file is read from (and kept in) memory.
+    # Returns the number of values written.
+    if files is not None:
+        stat = files.stat(settings_path)
+        if stat is None:
+            raise FileNotFoundError(settings_path)
+
+        def read_bytes():
+            return files.read(settings_path)
+    else:
+        stat = os.stat(settings_path)
+        loaded = []
+
+        def read_bytes():
+            if not loaded:
+                loaded.append(read_file(settings_path))
+            return loaded[0]
+
+    # The preset id of the profile's graphics doubles as the fingerprint of
+    # what the file holds, so an already applied preset is one comparison
+    fingerprint = preset_id(profile.graphics)
+    applied = cache.lookup(settings_path, stat, read_bytes) if cache is not None else None
+    if applied is not None:
+        if cache.fingerprint(settings_path) == fingerprint:
+            return 0
+        values = xml_values_for_profile(profile)
+        changes = {key: value for key, value in values.items() if applied.get(key) != value}
+        if not changes:
+            return 0
+    else:
+        applied = {}
+        values = changes = xml_values_for_profile(profile)
+
+    original = read_bytes()
+    if files is not None:
+        index = files.parsed(settings_path, SettingsXmlIndex)
+    else:
+        index = SettingsXmlIndex(original)
+    data = index.splice(changes)
+    if data != original:
+        atomic_write(settings_path, data)
+        if files is not None:
+            files.store(settings_path, data)
+    if cache is not None:
+        cache.record(settings_path, data, {**applied, **values},
+                     files.stat(settings_path) if files is not None else None, fingerprint)
+    return len(changes)
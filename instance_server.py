@@ -0,0 +1,75 @@
+# The running window's end of the single-instance hand-off (see
+# single_instance.py): a QLocalServer that reads one JSON request per
+# connection and passes it on together with a callable for the reply, which
+# may be sent later, e.g. once settings.json has been loaded.
+
+from functools import partial
+
+from PyQt5.QtCore import QObject, pyqtSignal
+from PyQt5.QtNetwork import QAbstractSocket, QLocalServer, QLocalSocket
+
+from single_instance import MAX_MESSAGE_BYTES, decode_message, encode_message, is_listening
+
+
+class InstanceServer(QObject):
+    request_received = pyqtSignal(object, object)  # request dict, reply(dict) callable
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.server = QLocalServer(self)
+        self.server.setSocketOptions(QLocalServer.UserAccessOption)  # Other users cannot send requests
+        self.server.newConnection.connect(self._on_new_connection)
+        self.connections = {}  # QLocalSocket -> bytes received so far
+
+    def listen(self, address):
+        # Returns False when another launcher is listening at address already
+        if self.server.listen(address):
+            return True
+        if self.server.serverError() == QAbstractSocket.AddressInUseError and not is_listening(address):
+            QLocalServer.removeServer(address)  # Left behind by a launcher that crashed
+            return self.server.listen(address)
+        return False
+
+    def close(self):
+        self.server.close()
+        for connection in list(self.connections):
+            connection.abort()
+
+    def _on_new_connection(self):
+        while self.server.hasPendingConnections():
+            connection = self.server.nextPendingConnection()
+            self.connections[connection] = b''
+            connection.readyRead.connect(partial(self._on_ready_read, connection))
+            connection.disconnected.connect(partial(self._on_disconnected, connection))
+
+    def _on_disconnected(self, connection):
+        self.connections.pop(connection, None)
+        connection.deleteLater()
+
+    def _on_ready_read(self, connection):
+        if connection not in self.connections:
+            return
+        received = self.connections[connection] + bytes(connection.readAll())
+        line, newline, _ = received.partition(b'\n')
+        if not newline:
+            if len(received) > MAX_MESSAGE_BYTES:
+                self._reply(connection, {'ok': False, 'error': 'Request too large.'})
+            else:
+                self.connections[connection] = received
+            return
+        self.connections[connection] = b''
+        connection.readyRead.disconnect()  # One request per connection
+        try:
+            request = decode_message(line)
+        except ValueError as e:
+            self._reply(connection, {'ok': False, 'error': f'Invalid request: {e}'})
+            return
+        self.request_received.emit(request, partial(self._reply, connection))
+
+    def _reply(self, connection, reply):
+        # The client may have given up waiting in the meantime
+        if connection not in self.connections or connection.state() != QLocalSocket.ConnectedState:
+            return
+        connection.write(encode_message(reply))
+        connection.flush()
+        connection.disconnectFromServer()
@@ -0,0 +1,174 @@
+import contextvars
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from paths import path_key
+
+IO_WORKERS = 4
+
+
+class IoExecutor:
+    # Runs file operations on a thread pool. Operations on the same file are
+    # queued and run strictly in submission order; different files proceed
+    # in parallel. Operations run in the context they were submitted from,
+    # so context variables (e.g. the current metrics operation) carry over.
+
+    def __init__(self, max_workers=IO_WORKERS):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='io')
+        self._lock = threading.Lock()
+        self._queues = {}  # file key -> deque of operations waiting behind the running one
+        self._tails = {}   # file key -> future of the last submitted operation
+
+    def submit(self, path, fn, *args, **kwargs):
+        future = Future()
+        context = contextvars.copy_context()
+        with self._lock:
+            self._enqueue(path_key(path), (future, context, fn, args, kwargs))
+        return future
+
+    def submit_many(self, paths, fn, *args, **kwargs):
+        # Run fn once everything queued so far for any of paths is done, and
+        # keep later operations on all of them waiting until it has finished,
+        # e.g. for a task that writes several files. Returns a future of fn's
+        # result.
+        result = Future()
+        context = contextvars.copy_context()
+        keys = list(dict.fromkeys(path_key(path) for path in paths))
+        gate = _Gate(self, len(keys), result, context, fn, args, kwargs)
+        with self._lock:
+            # Enqueued under one lock, so gates never interleave across queues
+            for key in keys:
+                gate_future = Future()
+                gate.futures.append((key, gate_future))
+                self._enqueue(key, (gate_future, None, gate, (), {}))
+        return result
+
+    def _enqueue(self, key, item):
+        # Called with self._lock held
+        self._tails[key] = item[0]
+        queue = self._queues.get(key)
+        if queue is None:
+            self._queues[key] = deque()
+            self._pool.submit(self._run, key, *item)
+        else:
+            queue.append(item)
+
+    def _run(self, key, future, context, fn, args, kwargs):
+        if isinstance(fn, _Gate):
+            fn.arrive()  # The queue moves on once the gated task is done
+            return
+        if future.set_running_or_notify_cancel():
+            try:
+                result = context.run(fn, *args, **kwargs)
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+        self._advance(key, future)
+
+    def _advance(self, key, future):
+        # future, the head of key's queue, is done: start the next operation
+        with self._lock:
+            queue = self._queues[key]
+            if queue:
+                self._pool.submit(self._run, key, *queue.popleft())
+            else:
+                del self._queues[key]
+                if self._tails.get(key) is future:
+                    del self._tails[key]
+
+    def pending(self, paths):
+        # Futures of the last operation queued for each path, if any
+        with self._lock:
+            tails = (self._tails.get(path_key(path)) for path in paths)
+            return [future for future in tails if future is not None]
+
+    def barrier(self, paths):
+        # Future that completes once everything queued so far for these paths
+        # has finished (successfully or not)
+        barrier = Future()
+        waiting = self.pending(paths)
+        if not waiting:
+            barrier.set_result(None)
+            return barrier
+
+        remaining = [len(waiting)]
+        lock = threading.Lock()
+
+        def done(_):
+            with lock:
+                remaining[0] -= 1
+                if remaining[0]:
+                    return
+            barrier.set_result(None)
+
+        for future in waiting:
+            future.add_done_callback(done)
+        return barrier
+
+    def submit_after(self, paths, path, fn, *args, **kwargs):
+        # Queue fn on path once everything queued so far for paths is done,
+        # without blocking a worker meanwhile. Returns a future of fn's result.
+        result = Future()
+        context = contextvars.copy_context()
+
+        def forward(future):
+            if future.exception() is not None:
+                result.set_exception(future.exception())
+            else:
+                result.set_result(future.result())
+
+        def start(_):
+            context.run(self.submit, path, fn, *args, **kwargs).add_done_callback(forward)
+        self.barrier(paths).add_done_callback(start)
+        return result
+
+    def wait(self, paths, timeout=None):
+        return self.barrier(paths).exception(timeout) is None
+
+    def shutdown(self, wait=True):
+        # Let the per-file queues drain before stopping the pool; the last
+        # operation of a file only finishes after everything queued before it
+        if wait:
+            with self._lock:
+                tails = list(self._tails.values())
+            for future in tails:
+                future.exception()
+        self._pool.shutdown(wait=wait)
+
+
+class _Gate:
+    # A submit_many task: a placeholder in each file's queue. When every
+    # placeholder has reached the head of its queue the task runs, then all
+    # the queues move on.
+
+    def __init__(self, executor, count, result, context, fn, args, kwargs):
+        self.executor = executor
+        self.waiting = count
+        self.result = result
+        self.context = context
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.futures = []  # (file key, placeholder future)
+        self._lock = threading.Lock()
+
+    def arrive(self):
+        with self._lock:
+            self.waiting -= 1
+            if self.waiting:
+                return
+        self.executor._pool.submit(self.run)
+
+    def run(self):
+        if self.result.set_running_or_notify_cancel():
+            try:
+                value = self.context.run(self.fn, *self.args, **self.kwargs)
+            except BaseException as e:
+                self.result.set_exception(e)
+            else:
+                self.result.set_result(value)
+        for key, future in self.futures:
+            future.set_result(None)
+            self.executor._advance(key, future)
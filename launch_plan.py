@@ -0,0 +1,130 @@
+# Launch plans: everything launch() has to write for a profile, rendered
+# ahead of time. A plan holds the final altv.toml and settings.xml bytes,
+# the mtime and size of each file it was rendered from, and the result of
+# the precondition checks. Launching with a fresh plan is a few stat calls,
+# at most two atomic writes and the spawn.
+
+import os
+
+from config_cache import file_stat
+from graphics_presets import preset_id
+from graphics_xml import SettingsXmlIndex, xml_values_for_profile
+from metrics import metrics
+from paths import ALTV_EXE
+from persistence import atomic_write
+from toml_config import TomlTransaction, toml_values_for_profile
+
+
+def plan_key(profile, altv_folder, settings_path):
+    # Everything a plan depends on apart from the files themselves
+    return (profile.name, profile.branch, profile.debug_mode, preset_id(profile.graphics),
+            altv_folder, settings_path)
+
+
+class PlannedWrite:
+    __slots__ = ('path', 'base_stat', 'data')
+
+    def __init__(self, path, base_stat, data):
+        self.path = path
+        self.base_stat = base_stat  # FileStat the data was rendered from
+        self.data = data            # New content, None if the file is already up to date
+
+
+class LaunchPlan:
+    __slots__ = ('key', 'exe_path', 'exe_stat', 'toml_values', 'xml_values', 'fingerprint',
+                 'toml', 'xml', 'error', 'warnings')
+
+    def __init__(self, key, exe_path):
+        self.key = key
+        self.exe_path = exe_path
+        self.exe_stat = None
+        self.toml_values = {}
+        self.xml_values = {}
+        self.fingerprint = None
+        self.toml = None
+        self.xml = None
+        self.error = None   # Failed precondition that prevents the launch
+        self.warnings = []  # Problems that are reported but do not stop it
+
+    def writes(self):
+        return [write for write in (self.toml, self.xml) if write is not None]
+
+    def is_fresh(self, key):
+        # True when nothing the plan was built from has changed
+        if key != self.key or file_stat(self.exe_path) != self.exe_stat:
+            return False
+        return all(file_stat(write.path) == write.base_stat for write in self.writes())
+
+
+def compile_launch_plan(profile, altv_folder, settings_path, toml_path, files, applied_state=None):
+    # Runs on the I/O executor; files is the ConfigFileCache. With an
+    # AppliedStateCache, a settings.xml that still holds the profile's values
+    # is not parsed, as in apply_graphics_settings.
+    exe_path = os.path.join(altv_folder, ALTV_EXE)
+    plan = LaunchPlan(plan_key(profile, altv_folder, settings_path), exe_path)
+    plan.exe_stat = file_stat(exe_path)
+
+    plan.toml_values = toml_values_for_profile(profile)
+    original = files.read(toml_path)
+    if original is not None:
+        # A missing altv.toml is left alone, as TomlTransaction.commit does
+        patched = TomlTransaction(toml_path).set_many(plan.toml_values).render(original)
+        plan.toml = PlannedWrite(toml_path, files.stat(toml_path), patched if patched != original else None)
+
+    original = files.read(settings_path)
+    if original is None:
+        plan.warnings.append('GTA V settings.xml not found in Documents.')
+    else:
+        plan.xml_values = xml_values_for_profile(profile)
+        plan.fingerprint = preset_id(profile.graphics)
+        stat = files.stat(settings_path)
+        if _is_applied(plan, settings_path, stat, files, applied_state):
+            plan.xml = PlannedWrite(settings_path, stat, None)
+        else:
+            try:
+                data = files.parsed(settings_path, SettingsXmlIndex).splice(plan.xml_values)
+            except ValueError as e:
+                plan.warnings.append(f'Failed to write graphics settings: {e}')
+            else:
+                plan.xml = PlannedWrite(settings_path, stat, data if data != original else None)
+
+    if plan.exe_stat is None:
+        plan.error = 'altv.exe not found in the specified folder.'
+    return plan
+
+
+def _is_applied(plan, settings_path, stat, files, applied_state):
+    # Whether settings.xml is known to hold the plan's values already
+    if applied_state is None or stat is None:
+        return False
+    applied = applied_state.lookup(settings_path, stat, lambda: files.read(settings_path))
+    if applied is None:
+        return False
+    return (applied_state.fingerprint(settings_path) == plan.fingerprint or
+            all(applied.get(key) == value for key, value in plan.xml_values.items()))
+
+
+def commit_launch_plan(plan, key, files, applied_state=None):
+    # Write a plan's buffers if it is still fresh. Returns False (writing
+    # nothing) when it is stale.
+    if not plan.is_fresh(key):
+        return False
+    if plan.toml is not None and plan.toml.data is not None:
+        _write(plan.toml, files)
+    if plan.xml is not None:
+        # The settings.xml part is its own operation in the metrics, as
+        # apply_graphics_settings does outside a launch
+        with metrics.operation('apply_graphics_settings'):
+            if plan.xml.data is not None:
+                _write(plan.xml, files)
+            if applied_state is not None:
+                data = plan.xml.data if plan.xml.data is not None else files.read(plan.xml.path)
+                if applied_state.fingerprint(plan.xml.path) != plan.fingerprint or plan.xml.data is not None:
+                    applied_state.record(plan.xml.path, data, plan.xml_values, files.stat(plan.xml.path),
+                                         plan.fingerprint)
+    return True
+
+
+def _write(write, files):
+    atomic_write(write.path, write.data)
+    files.store(write.path, write.data)
@@ -0,0 +1,1352 @@
+import os
+import threading
+import time
+from concurrent.futures import Future
+from functools import partial
+from PyQt5.QtWidgets import (
+    QApplication, QWidget, QVBoxLayout, QPushButton, QFileDialog,
+    QLineEdit, QLabel, QComboBox, QCheckBox, QMessageBox, QHBoxLayout,
+    QGroupBox, QScrollArea, QInputDialog, QDialog, QDialogButtonBox, QListWidget,
+    QListWidgetItem, QSpinBox, QMenu, QListView, QStackedWidget
+)
+from PyQt5.QtGui import QIcon
+from PyQt5.QtCore import Qt, QEvent, QObject, QTimer, pyqtSignal
+
+from altv_discovery import DISCOVERY_INDEX_FILE, discover_installs
+from applied_state import AppliedStateCache
+from client_process import ProcessManager
+from config_cache import ConfigFileCache
+from config_watcher import ConfigFileWatcher
+from graphics_xml import apply_graphics_settings, gta_settings_path
+from io_executor import IoExecutor
+from launch_plan import commit_launch_plan, compile_launch_plan, plan_key
+from metrics import metrics
+from multi_launch import INSTANCES_DIR, format_report, launch_instances, plan_instances
+from persistence import SETTINGS_FILE, write_json_file
+from profile_browser import ProfileListModel
+from profile_bundle import (
+    CONFLICT_RENAME, CONFLICT_REPLACE, CONFLICT_SKIP, conflicting_names, read_profile_bundle,
+    resolve_conflicts, write_profile_archive
+)
+from read_ahead import DEFAULT_BUDGET_MB, READ_AHEAD_MANIFEST_FILE, ReadAheadWarmer, record_hot_files
+from profiles import BRANCHES, Branch, Profile, ProfileStore
+from settings_schema import GRAPHICS_SCHEMA
+from settings_journal import JournaledSettingsWriter
+from single_instance import forward_request, server_address
+from cli import start_client as spawn_client
+from startup_profiler import profiler
+from toml_config import TomlTransaction, altv_toml_path, toml_values_for_profile
+
+ICON_PATH = 'icon.ico'
+SAVE_DEBOUNCE_MS = 400  # Coalesce bursts of changes (e.g. typing a path) into one write
+PROFILE_EDITOR_IDLE_SECONDS = 300  # Built profile editors left unvisited this long are torn down again
+PROFILE_EDITOR_SWEEP_MS = 60 * 1000
+APPLY_SETTLE_MS = 1000  # A selected profile is applied once switching profiles has stopped this long
+LAUNCH_PLAN_DEBOUNCE_MS = 250  # The launch plan is re-rendered this long after the last edit
+LAUNCH_PLAN_KEY = 'launch_plan'  # I/O executor queue for plan rendering
+MULTI_LAUNCH_KEY = 'multi_launch'  # I/O executor queue for preparing and starting instances
+MAX_INSTANCE_COPIES = 64
+READ_AHEAD_DELAY_MS = 2000  # Client files are warmed once the alt:V folder has been settled on this long
+MAX_READ_AHEAD_MB = 16384
+
+class MultiLaunchDialog(QDialog):
+    # Pick the profiles to start side by side and how many clients each
+    def __init__(self, profile_names, selected=None, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle('Multi Launch')
+        layout = QVBoxLayout()
+        layout.addWidget(QLabel('Profiles to launch:', self))
+        self.profile_list = QListWidget(self)
+        for name in profile_names:
+            item = QListWidgetItem(name, self.profile_list)
+            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+            item.setCheckState(Qt.Checked if name == selected else Qt.Unchecked)
+        layout.addWidget(self.profile_list)
+
+        copies_layout = QHBoxLayout()
+        copies_layout.addWidget(QLabel('Clients per profile', self))
+        copies_layout.addStretch()
+        self.copies_spin = QSpinBox(self)
+        self.copies_spin.setRange(1, MAX_INSTANCE_COPIES)
+        self.copies_spin.setToolTip('Every client runs from its own instance folder.')
+        copies_layout.addWidget(self.copies_spin)
+        layout.addLayout(copies_layout)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel, self)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+        self.setLayout(layout)
+
+    def selected_names(self):
+        return [self.profile_list.item(row).text() for row in range(self.profile_list.count())
+                if self.profile_list.item(row).checkState() == Qt.Checked]
+
+
+def read_settings_file(settings_writer):
+    # Runs on the I/O executor: read settings.json, replay the journal and
+    # parse the result into a ProfileStore
+    with profiler.phase('parse_settings'):
+        data = settings_writer.load()
+        if data is None:
+            return None
+        return data, ProfileStore.from_dict(data.get('profiles', {}), data.get('graphics_presets'))
+
+def apply_graphics_task(settings_path, profile, applied_state, files):
+    if not files.exists(settings_path):
+        raise OSError('GTA V settings.xml not found in Documents.')
+    try:
+        return apply_graphics_settings(settings_path, profile, applied_state, files)
+    except Exception as e:
+        raise OSError(f'Failed to write graphics settings: {e}') from e
+
+def fail_with(target, future):
+    # Pass the error of future on to the dependent future target
+    error = future.exception()
+    if error is not None:
+        target.set_exception(error)
+
+def apply_shared_graphics_task(settings_path, profile, applied_state, files):
+    # As the command line does for a multi launch, a missing settings.xml is skipped
+    if not files.exists(settings_path):
+        return 0
+    return apply_graphics_task(settings_path, profile, applied_state, files)
+
+def update_toml_task(toml_path, updates, files):
+    try:
+        return TomlTransaction(toml_path, files).set_many(updates).commit()
+    except Exception as e:
+        raise OSError(f'Failed to update altv.toml: {e}') from e
+
+
+class AltVLauncher(QWidget):
+    # Results of background I/O are delivered to the UI thread through these
+    io_failed = pyqtSignal(str)
+    settings_loaded = pyqtSignal(object)
+    settings_load_failed = pyqtSignal(str)
+    profiles_imported = pyqtSignal(object)
+    launch_ready = pyqtSignal(object, float, object)  # plan, click time, Future resolved once started
+    launch_plan_ready = pyqtSignal(object)
+    instance_started = pyqtSignal(str, str, int, float)
+    multi_launch_finished = pyqtSignal(object)
+    installs_discovered = pyqtSignal(object)
+    instance_reply = pyqtSignal(object, object)  # reply callable, message
+
+    def __init__(self):
+        super().__init__()
+
+        self.profiles = ProfileStore()
+        self.current_profile = None
+        self.altv_folder = ''
+        self.loading_settings = False  # Flag to track if settings are being loaded
+        self.settings_read_only = False  # settings.json could not be loaded, so it is never overwritten
+        self.applied_state = AppliedStateCache()  # What was last written into settings.xml
+
+        # altv.toml and settings.xml are kept in memory and only re-read when
+        # the watcher sees another program change them
+        self.config_cache = ConfigFileCache()
+        self.config_watcher = ConfigFileWatcher(self.config_cache, self)
+        self.config_watcher.file_changed.connect(self.on_config_file_changed)
+        self.applied_toml = {}  # altv.toml path -> values known to be in that file
+
+        # Switching profiles only changes the selection; the profile is applied
+        # once the selection settles, or right away by launch()
+        self.apply_timer = QTimer(self)
+        self.apply_timer.setSingleShot(True)
+        self.apply_timer.setInterval(APPLY_SETTLE_MS)
+        self.apply_timer.timeout.connect(self.apply_selected_profile)
+
+        # What launch() will write for the selected profile, rendered in the
+        # background after edits so the click only has to commit it
+        self.launch_plan = None
+        self.launch_plan_timer = QTimer(self)
+        self.launch_plan_timer.setSingleShot(True)
+        self.launch_plan_timer.setInterval(LAUNCH_PLAN_DEBOUNCE_MS)
+        self.launch_plan_timer.timeout.connect(self.prepare_launch_plan)
+
+        # All disk I/O runs on a thread pool, ordered per file
+        self.io_executor = IoExecutor()
+        self.io_failed.connect(self.show_error_message)
+        self.settings_loaded.connect(self.populate_settings)
+        self.settings_load_failed.connect(self.on_settings_load_failed)
+        self.profiles_imported.connect(self.add_imported_profiles)
+        self.launch_ready.connect(self.start_client)
+        self.launch_plan_ready.connect(self.on_launch_plan_ready)
+        self.instance_started.connect(self.on_instance_started)
+        self.multi_launch_finished.connect(self.on_multi_launch_finished)
+        self.installs_discovered.connect(self.on_installs_discovered)
+        self.instance_reply.connect(self.send_instance_reply)
+        self.pending_instance_requests = []  # (request, reply) forwarded before settings were loaded
+        self.altv_installs = []  # alt:V folders found on disk, offered by the folder pickers
+        self.discovery_cancelled = threading.Event()  # Set on close, so it does not wait for the scan
+
+        # settings.json is written behind the UI: changes restart the debounce
+        # timer and the final snapshot is written on a background thread
+        self.settings_writer = JournaledSettingsWriter(SETTINGS_FILE, self.io_executor, on_error=self.io_failed.emit)
+        self.save_timer = QTimer(self)
+        self.save_timer.setSingleShot(True)
+        self.save_timer.setInterval(SAVE_DEBOUNCE_MS)
+        self.save_timer.timeout.connect(self.write_settings)
+
+        # Client files are pulled into the OS cache while a profile is chosen
+        self.read_ahead_warmer = ReadAheadWarmer()
+        self.read_ahead_timer = QTimer(self)
+        self.read_ahead_timer.setSingleShot(True)
+        self.read_ahead_timer.setInterval(READ_AHEAD_DELAY_MS)
+        self.read_ahead_timer.timeout.connect(self.start_read_ahead)
+
+        self.process_manager = ProcessManager(self)
+        self.process_manager.client_started.connect(self.on_client_started)
+        self.process_manager.client_finished.connect(self.on_client_finished)
+
+        # Settings widgets exist only for profiles that were opened recently
+        self.profile_editors = {}  # profile name -> built editor, see show_profile_editor
+        self.editor_sweep_timer = QTimer(self)
+        self.editor_sweep_timer.setInterval(PROFILE_EDITOR_SWEEP_MS)
+        self.editor_sweep_timer.timeout.connect(self.evict_idle_profile_editors)
+        self.editor_sweep_timer.start()
+
+        with profiler.phase('init_ui'):
+            self.initUI()
+        with profiler.phase('load_settings'):
+            self.load_settings()
+
+    def initUI(self):
+        self.setStyleSheet("""
+            QWidget {
+                font-family: Arial;
+                font-size: 14px;
+            }
+            QGroupBox {
+                font-weight: bold;
+                border: 1px solid #AAAAAA;
+                border-radius: 5px;
+                margin-top: 10px;
+            }
+            QGroupBox::title {
+                subcontrol-origin: margin;
+                subcontrol-position: top left;
+                padding: 0 3px;
+            }
+            QPushButton {
+                background-color: #5A9BD5;
+                color: white;
+                padding: 5px 10px;
+                border-radius: 4px;
+            }
+            QPushButton:hover {
+                background-color: #4A89C7;
+            }
+            QPushButton:pressed {
+                background-color: #3A79B7;
+            }
+            QLineEdit, QComboBox {
+                border: 1px solid #CCCCCC;
+                border-radius: 4px;
+                padding: 4px;
+            }
+            QCheckBox, QLabel {
+                padding: 2px;
+            }
+            QListView {
+                border: 1px solid #AAAAAA;
+                border-radius: 5px;
+            }
+            QListView::item {
+                padding: 4px;
+            }
+        """)
+
+        main_layout = QVBoxLayout()
+
+        # alt:V Folder Path (Global Setting)
+        folder_path_group = QGroupBox('alt:V Folder')
+        folder_path_layout = QHBoxLayout()
+        self.folder_path_input = QLineEdit(self)
+        self.folder_path_input.setPlaceholderText('Path to alt:V folder')
+        self.folder_path_input.setToolTip('Select the folder where altv.exe is located.')
+        self.folder_path_input.textChanged.connect(self.on_altv_folder_changed)
+        self.folder_path_btn = QPushButton('...', self)
+        self.folder_path_btn.setIcon(QIcon.fromTheme('folder-open'))
+        self.folder_path_btn.setToolTip('Browse for alt:V folder.')
+        self.folder_path_btn.clicked.connect(self.browse_folder_path)
+        self.read_ahead_check = QCheckBox('Warm up files', self)
+        self.read_ahead_check.setToolTip('Read the client files into memory in the background while you pick '
+                                         'a profile, so alt:V starts faster.')
+        self.read_ahead_check.toggled.connect(self.on_read_ahead_changed)
+        self.read_ahead_budget_spin = QSpinBox(self)
+        self.read_ahead_budget_spin.setRange(64, MAX_READ_AHEAD_MB)
+        self.read_ahead_budget_spin.setSingleStep(64)
+        self.read_ahead_budget_spin.setSuffix(' MB')
+        self.read_ahead_budget_spin.setValue(DEFAULT_BUDGET_MB)
+        self.read_ahead_budget_spin.setToolTip('At most this much of the client files is warmed up.')
+        self.read_ahead_budget_spin.valueChanged.connect(self.on_read_ahead_changed)
+        folder_path_layout.addWidget(self.folder_path_input)
+        folder_path_layout.addWidget(self.folder_path_btn)
+        folder_path_layout.addWidget(self.read_ahead_check)
+        folder_path_layout.addWidget(self.read_ahead_budget_spin)
+        folder_path_group.setLayout(folder_path_layout)
+        main_layout.addWidget(folder_path_group)
+
+        # Profile Browser: searchable list of profiles next to the selected profile's settings
+        browser_layout = QHBoxLayout()
+        list_layout = QVBoxLayout()
+        self.profile_search_input = QLineEdit(self)
+        self.profile_search_input.setPlaceholderText('Search profiles')
+        self.profile_search_input.setToolTip('Filter by name (prefix or fuzzy) or by setting, '
+                                             'e.g. branch:dev, debug:on, preset:low or shadow:high.')
+        self.profile_search_input.setClearButtonEnabled(True)
+        self.profile_search_input.textChanged.connect(self.filter_profiles)
+        self.profile_model = ProfileListModel(self.profiles, self)
+        self.profile_list = QListView(self)
+        self.profile_list.setModel(self.profile_model)
+        self.profile_list.setUniformItemSizes(True)  # Rows are never measured one by one
+        self.profile_list.setEditTriggers(QListView.NoEditTriggers)
+        self.profile_list.selectionModel().currentChanged.connect(self.on_profile_row_changed)
+        list_layout.addWidget(self.profile_search_input)
+        list_layout.addWidget(self.profile_list)
+        self.profile_stack = QStackedWidget(self)
+        self.profile_placeholder = QLabel('Select or add a profile.', self)
+        self.profile_placeholder.setAlignment(Qt.AlignCenter)
+        self.profile_stack.addWidget(self.profile_placeholder)
+        browser_layout.addLayout(list_layout, 1)
+        browser_layout.addWidget(self.profile_stack, 2)
+        main_layout.addLayout(browser_layout)
+
+        # Profile Management Buttons
+        profile_btn_layout = QHBoxLayout()
+        self.add_profile_btn = QPushButton('Add Profile', self)
+        self.add_profile_btn.setIcon(QIcon.fromTheme('list-add'))
+        self.add_profile_btn.clicked.connect(self.add_profile)
+        self.delete_profile_btn = QPushButton('Delete Profile', self)
+        self.delete_profile_btn.setIcon(QIcon.fromTheme('list-remove'))
+        self.delete_profile_btn.clicked.connect(self.delete_profile)
+        self.import_profile_btn = QPushButton('Import Profile', self)
+        self.import_profile_btn.setIcon(QIcon.fromTheme('document-open'))
+        self.import_profile_btn.clicked.connect(self.import_profile)
+        self.export_profile_btn = QPushButton('Export Profile', self)
+        self.export_profile_btn.setIcon(QIcon.fromTheme('document-save'))
+        self.export_profile_btn.clicked.connect(self.export_profile)
+        self.import_folder_btn = QPushButton('Import Folder', self)
+        self.import_folder_btn.setIcon(QIcon.fromTheme('folder-open'))
+        self.import_folder_btn.clicked.connect(self.import_profile_folder)
+        self.export_all_btn = QPushButton('Export All', self)
+        self.export_all_btn.setIcon(QIcon.fromTheme('document-save-as'))
+        self.export_all_btn.clicked.connect(self.export_all_profiles)
+        profile_btn_layout.addWidget(self.add_profile_btn)
+        profile_btn_layout.addWidget(self.delete_profile_btn)
+        profile_btn_layout.addWidget(self.import_profile_btn)
+        profile_btn_layout.addWidget(self.import_folder_btn)
+        profile_btn_layout.addWidget(self.export_profile_btn)
+        profile_btn_layout.addWidget(self.export_all_btn)
+        main_layout.addLayout(profile_btn_layout)
+
+        # Common Buttons
+        self.launch_btn = QPushButton('Launch', self)
+        self.launch_btn.setIcon(QIcon.fromTheme('media-playback-start'))
+        self.launch_btn.clicked.connect(self.launch)
+        self.multi_launch_btn = QPushButton('Multi Launch', self)
+        self.multi_launch_btn.setIcon(QIcon.fromTheme('media-playback-start'))
+        self.multi_launch_btn.setToolTip('Start several clients at once, each from its own instance folder.')
+        self.multi_launch_btn.clicked.connect(self.open_multi_launch)
+        launch_layout = QHBoxLayout()
+        launch_layout.addWidget(self.launch_btn)
+        launch_layout.addWidget(self.multi_launch_btn)
+        main_layout.addLayout(launch_layout)
+
+        status_layout = QHBoxLayout()
+        self.client_status_label = QLabel('', self)
+        self.client_status_label.setToolTip('State of the last started alt:V client.')
+        self.diagnostics_btn = QPushButton('Diagnostics', self)
+        self.diagnostics_btn.setIcon(QIcon.fromTheme('utilities-system-monitor'))
+        self.diagnostics_btn.setToolTip('Show how often and how fast the launcher reads and writes its files.')
+        self.diagnostics_btn.clicked.connect(self.open_diagnostics)
+        status_layout.addWidget(self.client_status_label, 1)
+        status_layout.addWidget(self.diagnostics_btn)
+        main_layout.addLayout(status_layout)
+        self.diagnostics_dialog = None
+
+        self.setLayout(main_layout)
+        self.setWindowTitle('alt:V Easy Launch')
+        self.setWindowIcon(QIcon(ICON_PATH))
+        self.resize(900, 600)
+        self.show()
+
+    def create_profile_widget(self, profile_name):
+        widget = QWidget()
+        layout = QVBoxLayout()
+        widget.graphics_controls = {}  # Store graphics controls within the profile widget
+
+        # Scroll Area for settings
+        scroll_area = QScrollArea()
+        scroll_widget = QWidget()
+        scroll_layout = QVBoxLayout()
+
+        # Branch Selection
+        branch_group = QGroupBox('Branch')
+        branch_layout = QHBoxLayout()
+        branch_combo = QComboBox(self)
+        branch_combo.addItems(BRANCHES)
+        branch_combo.setToolTip('Select the alt:V branch to use.')
+        branch_layout.addWidget(branch_combo)
+        branch_group.setLayout(branch_layout)
+        scroll_layout.addWidget(branch_group)
+        widget.branch_combo = branch_combo  # Save reference to branch_combo
+
+        # Debug Mode
+        debug_group = QGroupBox('Debug Mode')
+        debug_layout = QHBoxLayout()
+        debug_checkbox = QCheckBox('Enable Debug Mode', self)
+        debug_checkbox.setToolTip('Enable or disable debug mode.')
+        debug_layout.addWidget(debug_checkbox)
+        debug_group.setLayout(debug_layout)
+        scroll_layout.addWidget(debug_group)
+        widget.debug_checkbox = debug_checkbox  # Save reference to debug_checkbox
+
+        # alt:V Folder of this profile
+        profile_folder_group = QGroupBox('alt:V Folder')
+        profile_folder_layout = QHBoxLayout()
+        folder_input = QLineEdit(self)
+        folder_input.setPlaceholderText('Use the global alt:V folder')
+        folder_input.setToolTip('alt:V folder used by this profile, e.g. a separate install for another branch.')
+        folder_btn = QPushButton('...', self)
+        folder_btn.setIcon(QIcon.fromTheme('folder-open'))
+        folder_btn.setToolTip('Browse for the alt:V folder of this profile.')
+        profile_folder_layout.addWidget(folder_input)
+        profile_folder_layout.addWidget(folder_btn)
+        profile_folder_group.setLayout(profile_folder_layout)
+        scroll_layout.addWidget(profile_folder_group)
+        widget.folder_input = folder_input
+        widget.folder_btn = folder_btn
+
+        # Graphics Settings
+        graphics_group = QGroupBox('Graphics Settings')
+        graphics_layout = QVBoxLayout()
+
+        preset_layout = QHBoxLayout()
+        preset_label = QLabel('Preset', self)
+        preset_combo = QComboBox(self)
+        preset_combo.setToolTip('Share graphics settings with other profiles. '
+                                'Changing a preset changes every profile that uses it.')
+        save_preset_btn = QPushButton('Save as Preset', self)
+        save_preset_btn.setToolTip('Store these graphics settings as a named preset.')
+        preset_layout.addWidget(preset_label)
+        preset_layout.addStretch()
+        preset_layout.addWidget(preset_combo)
+        preset_layout.addWidget(save_preset_btn)
+        graphics_layout.addLayout(preset_layout)
+        widget.preset_combo = preset_combo
+        widget.save_preset_btn = save_preset_btn
+
+        for setting in GRAPHICS_SCHEMA:
+            setting_layout = QHBoxLayout()
+            label = QLabel(setting.label, self)
+            label.setToolTip(setting.tooltip)
+            combo = QComboBox(self)
+            combo.addItems(setting.options)
+            combo.setToolTip(setting.tooltip)
+            setting_layout.addWidget(label)
+            setting_layout.addStretch()
+            setting_layout.addWidget(combo)
+            graphics_layout.addLayout(setting_layout)
+            widget.graphics_controls[setting.key] = combo  # Store controls in the profile widget
+
+        graphics_group.setLayout(graphics_layout)
+        scroll_layout.addWidget(graphics_group)
+
+        scroll_widget.setLayout(scroll_layout)
+        scroll_area.setWidgetResizable(True)
+        scroll_area.setWidget(scroll_widget)
+        layout.addWidget(scroll_area)
+
+        widget.setLayout(layout)
+        return widget
+
+    def connect_signals(self, profile_widget, profile):
+        # Widgets write straight into their profile record and mark only that profile dirty
+        profile_widget.branch_combo.currentIndexChanged.connect(partial(self.on_branch_changed, profile))
+        profile_widget.debug_checkbox.stateChanged.connect(partial(self.on_debug_mode_changed, profile))
+        profile_widget.folder_input.textChanged.connect(partial(self.on_profile_folder_changed, profile))
+        profile_widget.folder_btn.clicked.connect(partial(self.browse_profile_folder, profile_widget))
+        profile_widget.preset_combo.currentIndexChanged.connect(partial(self.on_preset_changed, profile))
+        profile_widget.save_preset_btn.clicked.connect(partial(self.save_graphics_preset, profile))
+        for setting, combo in profile_widget.graphics_controls.items():
+            combo.currentIndexChanged.connect(partial(self.on_graphics_setting_changed, profile, setting))
+
+    def on_graphics_setting_changed(self, profile, setting, index):
+        if self.loading_settings:
+            return
+        profile.set_graphics_code(setting, index)
+        if profile.preset is None:
+            self.profiles.mark_dirty(profile.name)
+        else:
+            # Edits the shared preset: linked profiles follow without being re-saved
+            self.profiles.mark_preset_dirty()
+            self.refresh_profile_widgets(profile.preset, exclude=profile)
+        self.save_settings()
+
+    def on_preset_changed(self, profile, index):
+        if self.loading_settings:
+            return
+        self.profiles.link_preset(profile, None if index <= 0 else self.profiles.presets.names()[index - 1])
+        self.refresh_profile_widgets(only=profile)
+        self.save_settings()
+
+    def save_graphics_preset(self, profile):
+        name, ok = QInputDialog.getText(self, 'Save Graphics Preset', 'Enter preset name:')
+        if not ok or not name:
+            return
+        try:
+            self.profiles.create_preset(name, profile)
+        except ValueError as e:
+            self.show_error_message(str(e))
+            return
+        self.refresh_profile_widgets(only=profile)
+        self.save_settings()
+
+    def built_profile_widgets(self):
+        for name, editor in self.profile_editors.items():
+            yield editor, self.profiles[name]
+
+    def refresh_profile_widgets(self, preset=None, exclude=None, only=None):
+        # Reload the built widgets of profiles linked to preset (or just only);
+        # the preset lists of all built widgets are updated
+        for profile_widget, profile in self.built_profile_widgets():
+            if profile is only or (only is None and profile is not exclude and profile.preset == preset):
+                self.load_profile_settings(profile_widget, profile)
+            else:
+                self.load_preset_choices(profile_widget, profile)
+
+    def on_debug_mode_changed(self, profile, state):
+        if self.loading_settings:
+            return  # Ignore changes during settings loading
+        profile.debug_mode = (state == Qt.Checked)
+        self.profiles.mark_dirty(profile.name)
+        self.save_settings()
+        self.toggle_debug_mode(profile.debug_mode)
+
+    def on_profile_folder_changed(self, profile, text):
+        if self.loading_settings:
+            return
+        profile.altv_folder = text or None
+        self.profiles.mark_dirty(profile.name)
+        self.save_settings()
+        if profile.name == self.current_profile:
+            self.apply_timer.start()  # Bring the new folder's altv.toml in line once typing stops
+
+    def browse_profile_folder(self, profile_widget):
+        folder_path = self.choose_altv_folder(profile_widget.folder_btn, 'Select alt:V folder for this profile')
+        if folder_path:
+            profile_widget.folder_input.setText(folder_path)
+
+    def on_branch_changed(self, profile, index):
+        if self.loading_settings:
+            return  # Ignore changes during settings loading
+        profile.branch = Branch(index)
+        self.profiles.mark_dirty(profile.name)
+        self.save_settings()
+        self.switch_branch(profile.branch.label)
+
+    def save_settings(self):
+        if self.loading_settings or self.settings_read_only:
+            return  # Do not save settings while loading, or over a file that could not be loaded
+        self.settings_writer.note_request()
+        self.save_timer.start()
+        self.launch_plan_timer.start()
+
+    @metrics.timed('save_settings')
+    def write_settings(self):
+        self.save_timer.stop()
+        data = {
+            'altv_folder': self.folder_path_input.text(),
+            'last_selected_profile': self.current_profile,
+            'read_ahead': {'enabled': self.read_ahead_check.isChecked(),
+                           'budget_mb': self.read_ahead_budget_spin.value()},
+            'graphics_presets': self.profiles.presets_dict(),
+            'profiles': self.profiles.to_dict()  # Only dirty profiles are re-rendered
+        }
+        return self.settings_writer.submit(data)
+
+    def flush_settings(self):
+        # Write out a pending debounced save right away and wait for it
+        if self.save_timer.isActive():
+            self.write_settings()
+        self.settings_writer.flush()
+
+    def watch_io(self, future, done_signal=None):
+        # Report the outcome of a background operation through signals
+        def done(future):
+            error = future.exception()
+            if error is not None:
+                self.io_failed.emit(str(error))
+            elif done_signal is not None:
+                done_signal.emit(future.result())
+        future.add_done_callback(done)
+        return future
+
+    @metrics.timed('load_settings')
+    def load_settings(self):
+        # settings.json is read and parsed in the background; saving stays
+        # disabled until populate_settings has applied the result
+        self.loading_settings = True
+        future = self.io_executor.submit(SETTINGS_FILE, read_settings_file, self.settings_writer)
+
+        def done(future):
+            error = future.exception()
+            if error is not None:
+                self.settings_load_failed.emit(str(error))
+            else:
+                self.settings_loaded.emit(future.result())
+        future.add_done_callback(done)
+        return future
+
+    def on_settings_load_failed(self, message):
+        # Start empty so the window stays usable, but keep whatever is on
+        # disk: nothing is saved for the rest of the session
+        self.settings_read_only = True
+        self.populate_settings(None)
+        self.show_error_message(f'Failed to load settings: {message}\n'
+                                'Changes made now will not be saved, so settings.json is left as it is.')
+
+    def populate_settings(self, result):
+        if result is not None:
+            data, self.profiles = result
+            profiler.set_info('profile_count', len(self.profiles))
+            self.altv_folder = data.get('altv_folder', '')
+            self.folder_path_input.setText(self.altv_folder)
+            last_profile = data.get('last_selected_profile', '')
+            read_ahead = data.get('read_ahead', {})
+            self.read_ahead_check.setChecked(bool(read_ahead.get('enabled', False)))
+            self.read_ahead_budget_spin.setValue(int(read_ahead.get('budget_mb', DEFAULT_BUDGET_MB)))
+
+            # The list only holds names; settings widgets are built for the
+            # selected profile alone
+            with profiler.phase('populate_profiles'):
+                self.profile_model.set_profiles(self.profiles)
+                if last_profile not in self.profiles:
+                    last_profile = self.profile_model.name_at(0)
+                if last_profile is not None:
+                    self.select_profile(last_profile)
+        self.loading_settings = False  # Finished loading settings
+        self.watch_config_files()
+        self.discover_altv_installs()
+        self.schedule_read_ahead()
+        pending, self.pending_instance_requests = self.pending_instance_requests, []
+        for request, reply in pending:
+            self.handle_instance_request(request, reply)
+        profiler.mark('settings_loaded')
+        if profiler.has_mark('first_paint'):
+            profiler.finish()
+        if self.settings_writer.backup_path is not None:
+            self.show_error_message(f'settings.json could not be read and was moved to '
+                                    f'{self.settings_writer.backup_path}. Starting with the settings that '
+                                    'could be recovered.')
+        if self.profiles.unresolved:
+            self.show_error_message('The graphics preset of these profiles is missing from settings.json, their '
+                                    'graphics settings were reset to the defaults: '
+                                    + ', '.join(self.profiles.unresolved))
+
+    def show_profile_editor(self, name):
+        # Build the profile's settings widgets on first use and show them
+        editor = self.profile_editors.get(name)
+        if editor is None:
+            with profiler.profile_tab(name):
+                profile = self.profiles[name]
+                editor = self.create_profile_widget(name)
+                self.load_profile_settings(editor, profile)
+                self.connect_signals(editor, profile)
+                self.profile_stack.addWidget(editor)
+                self.profile_editors[name] = editor
+        editor.last_active = time.monotonic()
+        self.profile_stack.setCurrentWidget(editor)
+        return editor
+
+    def drop_profile_editor(self, name):
+        editor = self.profile_editors.pop(name, None)
+        if editor is not None:
+            self.profile_stack.removeWidget(editor)
+            editor.deleteLater()
+
+    def evict_idle_profile_editors(self):
+        now = time.monotonic()
+        for name, editor in list(self.profile_editors.items()):
+            if name != self.current_profile and now - editor.last_active >= PROFILE_EDITOR_IDLE_SECONDS:
+                self.drop_profile_editor(name)
+
+    def load_profile_settings(self, profile_widget, profile):
+        was_loading = self.loading_settings
+        self.loading_settings = True  # Start loading profile settings
+
+        profile_widget.branch_combo.setCurrentIndex(profile.branch)
+        profile_widget.debug_checkbox.setChecked(profile.debug_mode)
+        profile_widget.folder_input.setText(profile.altv_folder or '')
+        self.load_preset_choices(profile_widget, profile)
+        for setting, combo in profile_widget.graphics_controls.items():
+            combo.setCurrentText(profile.graphics_value(setting))
+
+        self.loading_settings = was_loading  # Finished loading profile settings
+
+    def load_preset_choices(self, profile_widget, profile):
+        combo = profile_widget.preset_combo
+        names = self.profiles.presets.names()
+        combo.blockSignals(True)
+        combo.clear()
+        combo.addItem('Custom')
+        combo.addItems(names)
+        combo.setCurrentIndex(names.index(profile.preset) + 1 if profile.preset in names else 0)
+        combo.blockSignals(False)
+
+    @metrics.timed('discover_altv_installs')
+    def discover_altv_installs(self):
+        # Installs from the last scan are offered right away, the rescan
+        # replaces them when it is done
+        known_folders = [self.altv_folder] + [self.profiles[name].altv_folder for name in self.profiles]
+        future = self.io_executor.submit(
+            DISCOVERY_INDEX_FILE, discover_installs, known_folders, [INSTANCES_DIR],
+            on_cached=self.installs_discovered.emit, cancelled=self.discovery_cancelled)
+
+        def done(future):
+            if future.exception() is None and future.result() is not None:
+                self.installs_discovered.emit(future.result().installs)
+        future.add_done_callback(done)
+        return future
+
+    def on_installs_discovered(self, installs):
+        self.altv_installs = installs
+
+    def choose_altv_folder(self, button, title):
+        # Discovered installs are offered in a menu below the button, with
+        # the folder dialog as the last entry
+        if not self.altv_installs:
+            return QFileDialog.getExistingDirectory(self, title)
+        menu = QMenu(self)
+        for folder in self.altv_installs:
+            menu.addAction(folder).setData(folder)
+        menu.addSeparator()
+        browse_action = menu.addAction(QIcon.fromTheme('folder-open'), 'Browse...')
+        chosen = menu.exec_(button.mapToGlobal(button.rect().bottomLeft()))
+        if chosen is None:
+            return ''
+        if chosen is browse_action:
+            return QFileDialog.getExistingDirectory(self, title)
+        return chosen.data()
+
+    def browse_folder_path(self):
+        folder_path = self.choose_altv_folder(self.folder_path_btn, 'Select alt:V folder')
+        if folder_path:
+            self.folder_path_input.setText(folder_path)
+            self.altv_folder = folder_path
+            self.save_settings()
+            # Apply current profile settings after specifying the alt:V folder
+            if self.current_profile:
+                profile = self.profiles[self.current_profile]
+                self.update_altv_toml(**toml_values_for_profile(profile))
+
+    def on_altv_folder_changed(self, text):
+        self.altv_folder = text
+        self.save_settings()
+        if not self.loading_settings:
+            self.watch_config_files()
+            self.schedule_read_ahead()
+
+    def current_altv_folder(self):
+        # The selected profile's own alt:V folder, or the global one
+        profile = self.profiles.get(self.current_profile) if self.current_profile is not None else None
+        return (profile.altv_folder if profile is not None else None) or self.altv_folder
+
+    def on_read_ahead_changed(self, _):
+        self.save_settings()
+        if not self.loading_settings:
+            self.schedule_read_ahead()
+
+    def schedule_read_ahead(self):
+        # Warm the files of the current alt:V folder once it stops changing
+        if self.read_ahead_check.isChecked():
+            self.read_ahead_timer.start()
+        else:
+            self.read_ahead_timer.stop()
+            self.read_ahead_warmer.cancel()
+
+    def start_read_ahead(self):
+        altv_folder = self.current_altv_folder()
+        if self.read_ahead_check.isChecked() and altv_folder and os.path.isdir(altv_folder):
+            self.read_ahead_warmer.ensure_warm(altv_folder, self.read_ahead_budget_spin.value() * 1024 * 1024)
+
+    def learn_hot_files(self, altv_folder, since):
+        # Remember which files the finished client used, they are warmed first next time
+        self.io_executor.submit(READ_AHEAD_MANIFEST_FILE, record_hot_files, altv_folder, since)
+
+    def watch_config_files(self):
+        paths = [gta_settings_path()]
+        altv_folder = self.current_altv_folder()
+        if altv_folder:
+            paths.append(altv_toml_path(altv_folder))
+        self.config_watcher.set_paths(paths)
+        # Warm the cache in the background so the first apply needs no read
+        for path in paths:
+            self.io_executor.submit(path, self.config_cache.read, path)
+
+    def on_config_file_changed(self, path):
+        self.launch_plan_timer.start()
+        self.applied_toml = {toml_path: values for toml_path, values in self.applied_toml.items()
+                             if os.path.abspath(toml_path) != path}
+        self.io_executor.submit(path, self.config_cache.read, path)
+
+    def add_profile(self):
+        profile_name, ok = QInputDialog.getText(self, 'Create Profile', 'Enter profile name:')
+        if ok and profile_name:
+            if profile_name in self.profiles:
+                self.show_error_message('Profile already exists.')
+                return
+            self.profiles.add(Profile(profile_name))
+            self.profile_model.append(profile_name)
+            self.select_profile(profile_name)
+            self.save_settings()
+
+    def delete_profile(self):
+        profile_name = self.current_profile
+        if profile_name is None:
+            return
+        row = self.profile_model.row_of(profile_name)
+        self.current_profile = None
+        del self.profiles[profile_name]
+        self.drop_profile_editor(profile_name)
+        self.profile_model.remove(profile_name)
+        # Continue with the profile that took the deleted one's place
+        next_profile = self.profile_model.name_at(min(row or 0, self.profile_model.rowCount() - 1))
+        if next_profile is not None:
+            self.select_profile(next_profile)
+        else:
+            self.change_profile(None)
+        self.save_settings()
+
+    def filter_profiles(self, query):
+        self.profile_model.set_query(query)
+        if self.current_profile is not None:
+            self.select_profile(self.current_profile)
+
+    def select_profile(self, name):
+        # Highlight name in the list (when it is shown) and open it
+        row = self.profile_model.row_of(name)
+        if row is not None:
+            index = self.profile_model.index(row)
+            self.profile_list.setCurrentIndex(index)
+            self.profile_list.scrollTo(index)
+        if name != self.current_profile or name not in self.profile_editors:
+            self.change_profile(name)
+
+    def on_profile_row_changed(self, current, previous):
+        # Rows vanishing through filtering leave the open profile alone
+        name = self.profile_model.name_at(current.row())
+        if name is not None and name != self.current_profile:
+            self.change_profile(name)
+
+    def change_profile(self, name):
+        editor = self.profile_editors.get(self.current_profile)
+        if editor is not None:
+            editor.last_active = time.monotonic()  # Start the idle clock of the editor being left
+        if name is not None and name in self.profiles:
+            self.current_profile = name
+            self.show_profile_editor(name)
+            self.apply_timer.start()
+            self.schedule_read_ahead()  # The profile may use another alt:V folder
+        else:
+            self.current_profile = None
+            self.profile_stack.setCurrentWidget(self.profile_placeholder)
+            self.apply_timer.stop()
+
+    @metrics.timed('apply_selected_profile')
+    def apply_selected_profile(self):
+        # Persist the selection and bring altv.toml in line with the selected
+        # profile, writing only the values that differ from what is on disk
+        self.apply_timer.stop()
+        if self.current_profile is None:
+            return None
+        self.save_settings()
+        self.watch_config_files()
+        return self.update_altv_toml(**toml_values_for_profile(self.profiles[self.current_profile]))
+
+    def import_profile(self):
+        file_names, _ = QFileDialog.getOpenFileNames(
+            self, 'Import Profiles', '', 'Profiles (*.json *.zip);;JSON Files (*.json);;Zip Archives (*.zip)')
+        if file_names:
+            self.import_profiles(file_names)
+
+    def import_profile_folder(self):
+        folder = QFileDialog.getExistingDirectory(self, 'Import Profiles from Folder')
+        if folder:
+            self.import_profiles([folder])
+
+    def import_profiles(self, sources):
+        # Files are parsed in parallel off the UI thread, the result is added in one pass
+        future = self.io_executor.submit(sources[0], read_profile_bundle, sources)
+        future.add_done_callback(self.on_profile_bundle_read)
+        return future
+
+    def on_profile_bundle_read(self, future):
+        error = future.exception()
+        if error is not None:
+            self.io_failed.emit(f'Failed to import profiles: {error}')
+        else:
+            self.profiles_imported.emit(future.result())
+
+    def ask_conflict_policy(self, conflicts):
+        shown = ', '.join(conflicts[:5]) + (f' and {len(conflicts) - 5} more' if len(conflicts) > 5 else '')
+        box = QMessageBox(QMessageBox.Question, 'Import Profiles',
+                          f'{len(conflicts)} imported profile(s) already exist: {shown}', parent=self)
+        buttons = {
+            box.addButton('Replace', QMessageBox.DestructiveRole): CONFLICT_REPLACE,
+            box.addButton('Keep Both', QMessageBox.AcceptRole): CONFLICT_RENAME,
+            box.addButton('Skip', QMessageBox.RejectRole): CONFLICT_SKIP,
+        }
+        box.addButton(QMessageBox.Cancel)
+        box.exec_()
+        return buttons.get(box.clickedButton())
+
+    def add_imported_profiles(self, result):
+        profiles, errors = result
+        if errors:
+            self.show_error_message('Some profiles could not be imported:\n' + '\n'.join(errors))
+
+        conflicts = conflicting_names(profiles, self.profiles)
+        policy = self.ask_conflict_policy(conflicts) if conflicts else CONFLICT_SKIP
+        if policy is None:
+            return
+        to_add, replaced = resolve_conflicts(profiles, self.profiles, policy)
+        if not to_add:
+            return
+
+        # The list is rebuilt once for all of them; replaced profiles lose
+        # their editors and only the profile selected at the end gets one
+        for name in replaced:
+            self.drop_profile_editor(name)
+        for profile in to_add:
+            self.profiles.add(profile)
+        self.profile_model.refresh()
+        self.select_profile(to_add[0].name)
+        self.save_settings()
+
+    def export_profile(self):
+        if self.current_profile:
+            file_name, _ = QFileDialog.getSaveFileName(self, 'Export Profile', f'{self.current_profile}.json', 'JSON Files (*.json)')
+            if file_name:
+                future = self.io_executor.submit(file_name, write_json_file, file_name,
+                                                 self.profiles[self.current_profile].to_dict())
+                future.add_done_callback(self.on_profile_file_written)
+        else:
+            self.show_error_message('No profile selected.')
+
+    def on_profile_file_written(self, future):
+        error = future.exception()
+        if error is not None:
+            self.io_failed.emit(f'Failed to export profile: {error}')
+
+    def export_all_profiles(self):
+        if not self.profiles:
+            self.show_error_message('No profiles to export.')
+            return
+        file_name, _ = QFileDialog.getSaveFileName(self, 'Export All Profiles', 'profiles.zip', 'Zip Archives (*.zip)')
+        if file_name:
+            future = self.io_executor.submit(file_name, write_profile_archive, file_name, self.profiles.export_dict())
+            future.add_done_callback(self.on_profile_file_written)
+
+    def update_altv_toml(self, **updates):
+        # Apply any number of key updates to altv.toml in one read and at most
+        # one write, queued behind earlier writes to the same file
+        altv_folder = self.current_altv_folder()
+        if not altv_folder:
+            # alt:V folder path is not set
+            return None
+        toml_path = altv_toml_path(altv_folder)
+        applied = self.applied_toml.get(toml_path)
+        if applied is not None:
+            updates = {key: value for key, value in updates.items() if applied.get(key) != value}
+            if not updates:
+                return None
+        future = self.io_executor.submit(
+            toml_path, update_toml_task, toml_path, updates, self.config_cache)
+        self.note_toml_written(future, toml_path, updates)
+        return self.watch_io(future)
+
+    def note_toml_written(self, future, toml_path, updates):
+        # Assume the write lands; a failure makes the on-disk state unknown again
+        self.applied_toml.setdefault(toml_path, {}).update(updates)
+
+        def done(future):
+            if future.exception() is not None:
+                self.applied_toml.pop(toml_path, None)
+        future.add_done_callback(done)
+
+    @metrics.timed('toggle_debug_mode')
+    def toggle_debug_mode(self, debug_mode):
+        return self.update_altv_toml(debug=debug_mode)
+
+    @metrics.timed('switch_branch')
+    def switch_branch(self, branch_name):
+        return self.update_altv_toml(branch=branch_name)
+
+    def apply_graphics_settings(self, profile):
+        settings_path = gta_settings_path()
+        # The worker gets its own copy, the widgets may keep editing the profile
+        return self.watch_io(self.io_executor.submit(
+            settings_path, apply_graphics_task, settings_path, profile.copy(), self.applied_state,
+            self.config_cache))
+
+    def current_plan_key(self):
+        altv_folder = self.current_altv_folder()
+        if self.current_profile is None or not altv_folder:
+            return None
+        return plan_key(self.profiles[self.current_profile], altv_folder, gta_settings_path())
+
+    def prepare_launch_plan(self):
+        # Render the plan once the writes queued so far have landed, so it is
+        # based on the files as they will be when Launch is pressed
+        self.launch_plan_timer.stop()
+        if self.current_plan_key() is None:
+            self.launch_plan = None
+            return
+        profile = self.profiles[self.current_profile].copy()
+        altv_folder = self.current_altv_folder()
+        settings_path = gta_settings_path()
+        toml_path = altv_toml_path(altv_folder)
+
+        def rendered(future):
+            if future.exception() is None:
+                self.launch_plan_ready.emit(future.result())
+
+        self.io_executor.submit_after(
+            [toml_path, settings_path], LAUNCH_PLAN_KEY, compile_launch_plan, profile, altv_folder,
+            settings_path, toml_path, self.config_cache, self.applied_state).add_done_callback(rendered)
+
+    def on_launch_plan_ready(self, plan):
+        # Plans for a profile state that no longer exists are dropped
+        if plan.key == self.current_plan_key():
+            self.launch_plan = plan
+
+    @metrics.timed('launch')
+    def launch(self, report=True):
+        return self.commit_selected_profile(time.perf_counter(), report)
+
+    def commit_selected_profile(self, requested_at=None, report=True):
+        # Write the selected profile's altv.toml and settings.xml through its
+        # launch plan, then start the client unless requested_at is None.
+        # Returns a future of the plan that is done once the client has been
+        # started, or the plan committed; with report, problems are shown in
+        # the window, otherwise they are left to the caller.
+        if self.current_profile is None:
+            self.show_error_message('No profile selected.')
+            return None
+
+        altv_folder = self.current_altv_folder()
+        if not altv_folder:
+            self.show_error_message('alt:V folder path is empty.')
+            return None
+
+        profile = self.profiles[self.current_profile]
+        key = self.current_plan_key()
+        settings_path = gta_settings_path()
+        toml_path = altv_toml_path(altv_folder)
+
+        # The selection is persisted; altv.toml is written by the plan below
+        self.apply_timer.stop()
+        self.save_settings()
+
+        # Commit the plan once earlier writes to the same files are done,
+        # holding both files' queues, without waiting for unrelated I/O such
+        # as settings.json
+        plan = self.launch_plan if self.launch_plan is not None and self.launch_plan.key == key else None
+        self.launch_plan = None
+        started = Future() if requested_at is not None else None
+        task = partial(self.run_launch_plan, plan, key, profile.copy(), altv_folder, settings_path,
+                       toml_path, requested_at, started)
+        future = self.io_executor.submit_many([toml_path, settings_path], task)
+        self.note_plan_committed(future, toml_path, toml_values_for_profile(profile))
+        if started is not None:
+            future.add_done_callback(partial(fail_with, started))
+            future = started
+        if report:
+            self.report_plan(future)
+        return future
+
+    def note_plan_committed(self, future, toml_path, values):
+        # altv.toml is known to hold values only once the plan has been written
+        def done(future):
+            if future.exception() is None and future.result().toml is not None:
+                self.applied_toml[toml_path] = values
+            else:
+                self.applied_toml.pop(toml_path, None)
+        future.add_done_callback(done)
+
+    def report_plan(self, future):
+        def done(future):
+            error = future.exception()
+            if error is not None:
+                self.io_failed.emit(str(error))
+            else:
+                for warning in future.result().warnings:
+                    self.io_failed.emit(warning)
+        future.add_done_callback(done)
+
+    def run_launch_plan(self, plan, key, profile, altv_folder, settings_path, toml_path, requested_at, started):
+        # Runs on the I/O executor. A missing or stale plan is rendered right
+        # here. Returns the committed plan and has the client started unless
+        # requested_at is None, resolving started; raises OSError when the
+        # plan cannot be committed or launched.
+        try:
+            committed = plan is not None and commit_launch_plan(plan, key, self.config_cache, self.applied_state)
+            if not committed:
+                # The watcher may not have reported an outside change yet
+                for path in (toml_path, settings_path):
+                    if not self.config_cache.is_current(path):
+                        self.config_cache.invalidate(path)
+                plan = compile_launch_plan(profile, altv_folder, settings_path, toml_path, self.config_cache,
+                                           self.applied_state)
+                committed = commit_launch_plan(plan, key, self.config_cache, self.applied_state)
+        except Exception as e:
+            raise OSError(f'Failed to write the config files: {e}') from e
+        if not committed:
+            raise OSError('Config files changed while they were written, please try again.')
+        if requested_at is not None:
+            if plan.error is not None:
+                raise OSError(plan.error)
+            self.launch_ready.emit(plan, requested_at, started)
+        return plan
+
+    def open_multi_launch(self):
+        if not len(self.profiles):
+            self.show_error_message('No profiles to launch.')
+            return
+        dialog = MultiLaunchDialog(list(self.profiles), self.current_profile, self)
+        if dialog.exec_() == QDialog.Accepted:
+            self.multi_launch(dialog.selected_names(), dialog.copies_spin.value())
+
+    def multi_launch(self, names, copies=1):
+        # Prepare an instance folder per client and start them all on worker
+        # threads; started clients are handed to the process manager
+        if not names:
+            self.show_error_message('No profiles selected.')
+            return None
+        selection = []
+        for name in names:
+            profile = self.profiles[name]
+            altv_folder = profile.altv_folder or self.altv_folder
+            if not altv_folder:
+                self.show_error_message(f'alt:V folder path is empty for profile "{name}".')
+                return None
+            selection.append((profile, altv_folder))
+        self.save_settings()
+        requested_at = time.perf_counter()
+        jobs = plan_instances(selection, copies, INSTANCES_DIR)
+        # settings.xml exists once per user, so the first profile's graphics
+        # apply to all clients; they are started once it has been written
+        settings_path = gta_settings_path()
+        self.watch_io(self.io_executor.submit(
+            settings_path, apply_shared_graphics_task, settings_path, selection[0][0].copy(), self.applied_state,
+            self.config_cache))
+        self.multi_launch_btn.setEnabled(False)
+        self.client_status_label.setText(f'Starting {len(jobs)} alt:V instances...')
+
+        def start(job):
+            process = spawn_client(job.exe_path, job.output_path)
+            self.instance_started.emit(job.exe_path, job.output_path, process.pid, requested_at)
+            return process.pid
+
+        future = self.io_executor.submit_after([settings_path], MULTI_LAUNCH_KEY, launch_instances, jobs, start)
+
+        def done(future):
+            if future.exception() is not None:
+                self.io_failed.emit(f'Failed to launch instances: {future.exception()}')
+                self.multi_launch_finished.emit(None)
+            else:
+                self.multi_launch_finished.emit(future.result())
+        future.add_done_callback(done)
+        return future
+
+    def on_instance_started(self, exe_path, output_path, pid, requested_at):
+        self.process_manager.adopt(exe_path, pid, requested_at, output_path=output_path)
+
+    def on_multi_launch_finished(self, report):
+        self.multi_launch_btn.setEnabled(True)
+        if report is None:
+            return
+        self.client_status_label.setText(format_report(report))
+        if report['failed']:
+            self.show_error_message('Some instances failed to start:\n' + '\n'.join(report['failed']))
+
+    def handle_instance_request(self, request, reply):
+        # A request forwarded by a later start of the launcher, see single_instance.py
+        if self.loading_settings:
+            self.pending_instance_requests.append((request, reply))
+            return
+        if self.isMinimized():
+            self.showNormal()
+        self.raise_()
+        self.activateWindow()
+        try:
+            self.run_instance_request(request, reply)
+        except ValueError as e:
+            reply({'ok': False, 'error': str(e)})
+
+    def run_instance_request(self, request, reply):
+        # The reply is sent once the request has been carried out, so the
+        # requesting process exits as it would have running it itself.
+        # Invalid requests raise ValueError.
+        action = request.get('action')
+        if action == 'show':
+            reply({'ok': True, 'message': 'alt:V Easy Launch is already running, switched to its window.'})
+            return
+        if action == 'multi_launch':
+            names = request.get('profiles') or []
+            missing = [name for name in names if name not in self.profiles]
+            if missing:
+                raise ValueError(f'Profile "{missing[0]}" does not exist.')
+            for name in names:
+                if not (self.profiles[name].altv_folder or self.altv_folder):
+                    raise ValueError(f'alt:V folder path is empty for profile "{name}".')
+            copies = request.get('copies', 1)
+            if not isinstance(copies, int) or not 1 <= copies <= MAX_INSTANCE_COPIES:
+                raise ValueError(f'Instances must be between 1 and {MAX_INSTANCE_COPIES}.')
+            future = self.multi_launch(names, copies)
+            if future is None:
+                raise ValueError('No profiles selected.')
+
+            def started(report):
+                if report['failed']:
+                    return {'ok': False, 'error': 'Some instances failed to start:\n' + '\n'.join(report['failed'])}
+                return {'ok': True, 'message': format_report(report)}
+            self.reply_when_done(future, reply, started)
+            return
+        if action not in ('launch', 'apply'):
+            raise ValueError(f'Unknown request "{action}".')
+
+        profile_name = request.get('profile') or self.current_profile
+        if not profile_name:
+            raise ValueError('No profile selected.')
+        if profile_name not in self.profiles:
+            raise ValueError(f'Profile "{profile_name}" does not exist.')
+        self.select_profile(profile_name)
+        if not self.current_altv_folder():
+            raise ValueError(f'alt:V folder path is empty for profile "{profile_name}".')
+        if action == 'apply':
+            future = self.commit_selected_profile(report=False)
+            done = f'Applied profile "{profile_name}".'
+        else:
+            future = self.launch(report=False)
+            done = f'Started alt:V with profile "{profile_name}".'
+        self.reply_when_done(future, reply, lambda plan: {'ok': True, 'message': done, 'warnings': plan.warnings})
+
+    def reply_when_done(self, future, reply, describe):
+        # Send describe(result), or the error, once future is done
+        def done(future):
+            error = future.exception()
+            message = {'ok': False, 'error': str(error)} if error is not None else describe(future.result())
+            self.instance_reply.emit(reply, message)
+        future.add_done_callback(done)
+
+    def send_instance_reply(self, reply, message):
+        reply(message)
+
+    def open_diagnostics(self):
+        if self.diagnostics_dialog is None:
+            from diagnostics_panel import DiagnosticsDialog  # Only loaded when asked for
+            self.diagnostics_dialog = DiagnosticsDialog(metrics, self.diagnostics_counters, self)
+        self.diagnostics_dialog.show()
+        self.diagnostics_dialog.raise_()
+
+    def diagnostics_counters(self):
+        stats = self.settings_writer.stats()
+        counters = {
+            'settings saves requested': stats['requests'],
+            'settings writes': stats['writes'],
+            'config cache hits': self.config_cache.hits,
+            'misses': self.config_cache.misses,
+        }
+        warmed = self.read_ahead_warmer.last
+        if warmed is not None:
+            counters['read-ahead'] = (f'{warmed.bytes / (1024 * 1024):.0f} MiB in {warmed.files} files, '
+                                      f'{warmed.seconds:.1f} s')
+        return counters
+
+    def start_client(self, plan, requested_at, started):
+        altv_folder = os.path.dirname(plan.exe_path)
+        warm = self.read_ahead_warmer.is_warm(altv_folder)
+        try:
+            client = self.process_manager.launch(plan.exe_path, requested_at)
+        except OSError as e:
+            started.set_exception(e)
+            return
+        started.set_result(plan)
+        client.ready.connect(partial(self.on_client_ready, client, warm))
+        if self.read_ahead_check.isChecked():
+            client.finished.connect(lambda exit_code, since=client.started_at:
+                                    self.learn_hot_files(altv_folder, since))
+
+    def on_client_ready(self, client, warm):
+        # Launch-to-ready is kept apart for warmed and cold starts, so the
+        # diagnostics show what the read-ahead gains
+        metrics.observe('launch_to_ready_warm' if warm else 'launch_to_ready_cold', client.ready_latency_ms)
+        if client.running:
+            self.client_status_label.setText(
+                f'alt:V ready (PID {client.pid}, {client.ready_latency_ms / 1000:.1f} s after click'
+                f'{", files warmed up" if warm else ""})')
+
+    def on_client_started(self, client):
+        metrics.observe('click_to_spawn', client.spawn_latency_ms)
+        self.client_status_label.setText(
+            f'alt:V running (PID {client.pid}, started in {client.spawn_latency_ms:.0f} ms after click)')
+
+    def on_client_finished(self, client):
+        exit_code = 'unknown exit code' if client.exit_code is None else f'exit code {client.exit_code}'
+        self.client_status_label.setText(f'alt:V exited with {exit_code} after {client.lifetime:.0f} s')
+
+    def closeEvent(self, event):
+        if self.apply_timer.isActive():
+            self.apply_selected_profile()
+        self.save_settings()
+        self.flush_settings()
+        self.settings_writer.close()
+        self.launch_plan_timer.stop()
+        self.read_ahead_timer.stop()
+        self.read_ahead_warmer.cancel()
+        self.discovery_cancelled.set()
+        self.config_watcher.set_paths([])
+        self.io_executor.shutdown(wait=True)
+        metrics.close()
+        event.accept()
+
+    def show_error_message(self, message):
+        QMessageBox.critical(self, 'Error', message)
+
+class FirstPaintWatcher(QObject):
+    # Closes the startup profile once the window has painted for the first time
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Paint:
+            obj.removeEventFilter(self)
+            profiler.mark('first_paint')
+            if profiler.has_mark('settings_loaded'):
+                profiler.finish()
+        return False
+
+def run_gui(argv, single_instance=True):
+    with profiler.phase('qapplication'):
+        app = QApplication(argv)
+    server = None
+    if single_instance:
+        from instance_server import InstanceServer
+        server = InstanceServer(app)
+        if not server.listen(server_address(SETTINGS_FILE)):
+            # Another window started at the same time and won
+            exit_code = forward_request({'action': 'show'}, SETTINGS_FILE)
+            if exit_code is not None:
+                return exit_code
+            server = None
+    with profiler.phase('main_window'):
+        ex = AltVLauncher()
+    if server is not None:
+        server.request_received.connect(ex.handle_instance_request)
+        app.aboutToQuit.connect(server.close)
+    if profiler.enabled:
+        watcher = FirstPaintWatcher(ex)
+        ex.installEventFilter(watcher)
+        app.aboutToQuit.connect(profiler.finish)  # Never painted (e.g. started minimized)
+    return app.exec_()
@@ -0,0 +1,279 @@
+# Runtime metrics for the launcher's hot paths. An operation (saving
+# settings, switching branch, launching, ...) counts its calls and errors,
+# the bytes read and written on its behalf and its wall time, from the call
+# until the background I/O it queued has finished. The operation travels
+# with the work through a context variable, which IoExecutor carries into
+# its worker threads, so file reads and writes anywhere below are charged to
+# the operation that caused them. Latencies are kept in a fixed-size ring
+# buffer per operation, so memory stays bounded over long sessions.
+#
+# Finished operations can be streamed to a JSON lines file with
+# --metrics-log or the ALTV_LAUNCHER_METRICS_LOG environment variable.
+
+import json
+import os
+import threading
+import time
+from array import array
+from concurrent.futures import Future
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+METRICS_LOG_ENV = 'ALTV_LAUNCHER_METRICS_LOG'
+RING_SIZE = 512  # Latency samples kept per operation
+BUCKET_BOUNDS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+NO_OPERATION = 'other'  # I/O outside any instrumented operation
+
+_current = ContextVar('metrics_operation', default=None)
+
+
+def percentile(ordered, fraction):
+    if not ordered:
+        return None
+    return round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))], 3)
+
+
+class LatencyRing:
+    # The last RING_SIZE latencies of an operation, in milliseconds
+
+    def __init__(self, size=RING_SIZE):
+        self.samples = array('d', bytes(8 * size))
+        self.size = size
+        self.count = 0  # Samples ever added; the ring holds the last min(count, size)
+
+    def add(self, value_ms):
+        self.samples[self.count % self.size] = value_ms
+        self.count += 1
+
+    def values(self):
+        return list(self.samples[:min(self.count, self.size)])
+
+    def summary(self):
+        ordered = sorted(self.values())
+        buckets = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+        position = 0
+        for value in ordered:
+            while position < len(BUCKET_BOUNDS_MS) and value > BUCKET_BOUNDS_MS[position]:
+                position += 1
+            buckets[position] += 1
+        return {
+            'samples': len(ordered),
+            'mean_ms': round(sum(ordered) / len(ordered), 3) if ordered else None,
+            'p50_ms': percentile(ordered, 0.50),
+            'p95_ms': percentile(ordered, 0.95),
+            'p99_ms': percentile(ordered, 0.99),
+            'max_ms': round(ordered[-1], 3) if ordered else None,
+            'buckets': buckets,  # Counts per BUCKET_BOUNDS_MS upper bound, the last one unbounded
+        }
+
+
+class OperationStats:
+    __slots__ = ('calls', 'errors', 'bytes_read', 'bytes_written', 'reads', 'writes', 'total_ms', 'latency')
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.reads = 0
+        self.writes = 0
+        self.total_ms = 0.0
+        self.latency = LatencyRing()
+
+    def to_dict(self):
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'reads': self.reads,
+            'bytes_read': self.bytes_read,
+            'writes': self.writes,
+            'bytes_written': self.bytes_written,
+            'total_ms': round(self.total_ms, 3),
+            **self.latency.summary(),
+        }
+
+
+class Operation:
+    # One running operation. It finishes when its scope has been left and
+    # every future it holds is done.
+    __slots__ = ('metrics', 'name', 'started', 'bytes_read', 'bytes_written', 'failed', '_pending')
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+        self.started = time.perf_counter()
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.failed = False
+        self._pending = 1  # The scope itself
+
+    def hold(self, future):
+        with self.metrics.lock:
+            self._pending += 1
+        future.add_done_callback(self._future_done)
+        return future
+
+    def _future_done(self, future):
+        if future.cancelled() or future.exception() is not None:
+            self.failed = True
+        self.release()
+
+    def release(self):
+        with self.metrics.lock:
+            self._pending -= 1
+            if self._pending:
+                return
+        self.metrics.finish(self)
+
+
+class Metrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.operations = {}  # name -> OperationStats
+        self.files = {}       # file name -> [reads, bytes read, writes, bytes written]
+        self.log_path = None
+        self._log = None
+
+    def enable_log(self, path):
+        with self.lock:
+            self.log_path = path
+
+    def enable_from_environment(self):
+        path = os.environ.get(METRICS_LOG_ENV)
+        if path:
+            self.enable_log(path)
+
+    def _stats(self, name):
+        stats = self.operations.get(name)
+        if stats is None:
+            stats = self.operations[name] = OperationStats()
+        return stats
+
+    @contextmanager
+    def operation(self, name):
+        operation = Operation(self, name)
+        token = _current.set(operation)
+        try:
+            yield operation
+        except BaseException:
+            operation.failed = True
+            raise
+        finally:
+            _current.reset(token)
+            operation.release()
+
+    def timed(self, name):
+        # Method decorator: the call is an operation; a returned Future is
+        # held, so the time until the queued I/O is done is included
+        def decorate(fn):
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.operation(name) as operation:
+                    result = fn(*args, **kwargs)
+                    if isinstance(result, Future):
+                        operation.hold(result)
+                    return result
+            return wrapper
+        return decorate
+
+    def _count(self, path, nbytes, written):
+        operation = _current.get()
+        name = operation.name if operation is not None else NO_OPERATION
+        file_name = os.path.basename(path)
+        with self.lock:
+            stats = self._stats(name)
+            totals = self.files.get(file_name)
+            if totals is None:
+                totals = self.files[file_name] = [0, 0, 0, 0]
+            if written:
+                stats.writes += 1
+                stats.bytes_written += nbytes
+                totals[2] += 1
+                totals[3] += nbytes
+                if operation is not None:
+                    operation.bytes_written += nbytes
+            else:
+                stats.reads += 1
+                stats.bytes_read += nbytes
+                totals[0] += 1
+                totals[1] += nbytes
+                if operation is not None:
+                    operation.bytes_read += nbytes
+
+    def read(self, path, nbytes):
+        self._count(path, nbytes, False)
+
+    def wrote(self, path, nbytes):
+        self._count(path, nbytes, True)
+
+    def observe(self, name, value_ms):
+        # A latency measured elsewhere, e.g. click to client spawn
+        with self.lock:
+            stats = self._stats(name)
+            stats.calls += 1
+            stats.total_ms += value_ms
+            stats.latency.add(value_ms)
+        self._write_log({'operation': name, 'ms': round(value_ms, 3)})
+
+    def finish(self, operation):
+        duration_ms = (time.perf_counter() - operation.started) * 1000
+        with self.lock:
+            stats = self._stats(operation.name)
+            stats.calls += 1
+            stats.errors += operation.failed
+            stats.total_ms += duration_ms
+            stats.latency.add(duration_ms)
+        self._write_log({
+            'operation': operation.name,
+            'ms': round(duration_ms, 3),
+            'bytes_read': operation.bytes_read,
+            'bytes_written': operation.bytes_written,
+            'error': operation.failed,
+        })
+
+    def _write_log(self, entry):
+        if self.log_path is None:
+            return
+        line = json.dumps({'time': round(time.time(), 3), **entry}) + '\n'
+        with self.lock:
+            try:
+                if self._log is None:
+                    self._log = open(self.log_path, 'a', buffering=1)
+                self._log.write(line)
+            except OSError:
+                self.log_path = None  # Metrics never break the launcher
+
+    def snapshot(self):
+        with self.lock:
+            operations = {name: stats.to_dict() for name, stats in sorted(self.operations.items())}
+            files = {name: {'reads': totals[0], 'bytes_read': totals[1],
+                            'writes': totals[2], 'bytes_written': totals[3]}
+                     for name, totals in sorted(self.files.items())}
+        return {'started': self.started, 'uptime_s': round(time.time() - self.started, 3),
+                'operations': operations, 'files': files}
+
+    def export_jsonl(self, path):
+        # One line per operation and per file, for loading into a notebook
+        snapshot = self.snapshot()
+        with open(path, 'w') as file:
+            for name, stats in snapshot['operations'].items():
+                file.write(json.dumps({'kind': 'operation', 'name': name, **stats}) + '\n')
+            for name, totals in snapshot['files'].items():
+                file.write(json.dumps({'kind': 'file', 'name': name, **totals}) + '\n')
+
+    def reset(self):
+        with self.lock:
+            self.started = time.time()
+            self.operations = {}
+            self.files = {}
+
+    def close(self):
+        with self.lock:
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+
+
+metrics = Metrics()
@@ -0,0 +1,216 @@
+# Starting many clients at once, e.g. to load-test a server. Every client
+# gets its own instance directory mirroring its profile's alt:V folder:
+# files are hardlinked (or cloned copy-on-write, or symlinked where links are
+# not possible) instead of copied, only altv.toml is a real copy so it can be
+# patched per instance, and cache/log directories start out empty. Instances
+# are prepared and patched in parallel, then all clients are started in
+# parallel.
+
+import hashlib
+import os
+import re
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from paths import ALTV_EXE
+from persistence import atomic_write
+from toml_config import ALTV_TOML, TomlTransaction, toml_values_for_profile
+
+INSTANCES_DIR = 'instances'
+INSTANCE_OUTPUT_FILE = 'client_output.log'
+INSTANCE_WORKERS = 8
+PRIVATE_DIRS = ('cache', 'logs', 'crashdumps')  # Written by the client, not shared
+PRIVATE_FILES = (ALTV_TOML, INSTANCE_OUTPUT_FILE)
+
+FICLONE = 0x40049409  # Linux ioctl for copy-on-write clones (btrfs, xfs)
+
+_UNSAFE_CHARS_RE = re.compile(r'[^\w.-]+')
+
+
+def instance_name(profile_name, index):
+    # Directory name of a profile's index-th instance. A name that had to be
+    # changed to be safe, or that differs from others only in case, gets a
+    # short hash of the original, so different profiles get different
+    # directories.
+    safe = _UNSAFE_CHARS_RE.sub('_', profile_name).strip('._') or 'profile'
+    if safe != profile_name.lower():
+        safe += '-' + hashlib.sha1(profile_name.encode('utf-8')).hexdigest()[:6]
+    return f'{safe}-{index + 1}'
+
+
+def _clone(source, target):
+    import fcntl
+
+    with open(source, 'rb') as src, open(target, 'wb') as dst:
+        fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+
+
+def share_file(source, target):
+    # Make target a cheap alias of source. Returns the method that worked.
+    try:
+        os.link(source, target)
+        return 'linked'
+    except OSError:
+        pass
+    if os.name != 'nt':
+        try:
+            _clone(source, target)
+            return 'cloned'
+        except (OSError, ImportError):
+            try:
+                os.remove(target)
+            except OSError:
+                pass
+    try:
+        os.symlink(source, target)
+        return 'symlinked'
+    except OSError:
+        pass
+    shutil.copy2(source, target)
+    return 'copied'
+
+
+def _same_file(source, target):
+    try:
+        return os.path.samefile(source, target)
+    except OSError:
+        return False
+
+
+def prepare_instance(source, target):
+    # Mirror source into target. Files already shared from a previous run are
+    # reused, so preparing an existing instance again is only a tree walk.
+    counts = {'linked': 0, 'cloned': 0, 'symlinked': 0, 'copied': 0, 'reused': 0}
+    source = os.path.abspath(source)
+    target = os.path.abspath(target)
+    os.makedirs(target, exist_ok=True)
+
+    pending = [(source, target)]
+    while pending:
+        source_dir, target_dir = pending.pop()
+        for entry in os.scandir(source_dir):
+            target_path = os.path.join(target_dir, entry.name)
+            if entry.is_dir(follow_symlinks=False):
+                if os.path.abspath(entry.path) == target or target.startswith(os.path.abspath(entry.path) + os.sep):
+                    continue  # The instances live inside the source folder
+                os.makedirs(target_path, exist_ok=True)
+                if source_dir != source or entry.name.lower() not in PRIVATE_DIRS:
+                    pending.append((entry.path, target_path))
+            elif source_dir == source and entry.name in PRIVATE_FILES:
+                if entry.name == ALTV_TOML:
+                    with open(entry.path, 'rb') as file:
+                        atomic_write(target_path, file.read())
+                    counts['copied'] += 1
+            elif _same_file(entry.path, target_path):
+                counts['reused'] += 1
+            else:
+                if os.path.lexists(target_path):
+                    os.remove(target_path)
+                counts[share_file(entry.path, target_path)] += 1
+    return counts
+
+
+class InstanceJob:
+    __slots__ = ('name', 'profile', 'source', 'directory', 'counts', 'prepare_ms', 'pid', 'spawn_ms', 'error')
+
+    def __init__(self, name, profile, source, directory):
+        self.name = name
+        self.profile = profile  # A copy, jobs run on worker threads
+        self.source = source
+        self.directory = directory
+        self.counts = None
+        self.prepare_ms = None
+        self.pid = None
+        self.spawn_ms = None
+        self.error = None
+
+    @property
+    def exe_path(self):
+        return os.path.join(self.directory, ALTV_EXE)
+
+    @property
+    def output_path(self):
+        return os.path.join(self.directory, INSTANCE_OUTPUT_FILE)
+
+
+def plan_instances(selection, copies=1, root=INSTANCES_DIR):
+    # selection: [(profile, alt:V folder)]; copies instances per profile.
+    # Every job gets a directory of its own, also where names only differ in
+    # case, since jobs are prepared in parallel.
+    jobs = []
+    taken = set()
+    for profile, folder in selection:
+        for index in range(copies):
+            name = instance_name(profile.name, index)
+            unique, counter = name, 2
+            while unique.lower() in taken:
+                unique = f'{name}-{counter}'
+                counter += 1
+            taken.add(unique.lower())
+            jobs.append(InstanceJob(unique, profile.copy(), folder, os.path.join(os.path.abspath(root), unique)))
+    return jobs
+
+
+def _prepare_job(job):
+    start = time.perf_counter()
+    try:
+        if not os.path.exists(os.path.join(job.source, ALTV_EXE)):
+            raise OSError(f'altv.exe not found in {job.source}')
+        job.counts = prepare_instance(job.source, job.directory)
+        TomlTransaction(os.path.join(job.directory, ALTV_TOML)).set_many(
+            toml_values_for_profile(job.profile)).commit()
+    except OSError as e:
+        job.error = f'{job.name}: {e}'
+    job.prepare_ms = round((time.perf_counter() - start) * 1000, 3)
+    return job
+
+
+def _start_job(job, start_client):
+    start = time.perf_counter()
+    try:
+        job.pid = start_client(job)
+    except OSError as e:
+        job.error = f'{job.name}: {e}'
+    job.spawn_ms = round((time.perf_counter() - start) * 1000, 3)
+    return job
+
+
+def launch_instances(jobs, start_client, max_workers=INSTANCE_WORKERS):
+    # Prepare every instance, then start them all; start_client(job) spawns
+    # the job's client and returns its pid. Returns the throughput report.
+    began = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='instance') as pool:
+        list(pool.map(_prepare_job, jobs))
+        prepared_at = time.perf_counter()
+        ready = [job for job in jobs if job.error is None]
+        list(pool.map(lambda job: _start_job(job, start_client), ready))
+    finished_at = time.perf_counter()
+    return throughput_report(jobs, began, prepared_at, finished_at)
+
+
+def throughput_report(jobs, began, prepared_at, finished_at):
+    started = [job for job in jobs if job.pid is not None]
+    total_s = finished_at - began
+    counts = {}
+    for job in jobs:
+        for method, count in (job.counts or {}).items():
+            counts[method] = counts.get(method, 0) + count
+    return {
+        'instances': len(jobs),
+        'started': len(started),
+        'failed': [job.error for job in jobs if job.error is not None],
+        'prepare_s': round(prepared_at - began, 3),
+        'start_s': round(finished_at - prepared_at, 3),
+        'total_s': round(total_s, 3),
+        'instances_per_minute': round(len(started) / total_s * 60, 1) if total_s > 0 else None,
+        'files': counts,
+        'clients': [{'name': job.name, 'directory': job.directory, 'pid': job.pid,
+                     'prepare_ms': job.prepare_ms, 'spawn_ms': job.spawn_ms} for job in jobs],
+    }
+
+
+def format_report(report):
+    return (f'Started {report["started"]}/{report["instances"]} instances in {report["total_s"]:.1f} s '
+            f'({report["instances_per_minute"] or 0:.0f} per minute; '
+            f'prepare {report["prepare_s"]:.1f} s, start {report["start_s"]:.1f} s)')
@@ -0,0 +1,12 @@
+# Names and keys shared by everything that handles the alt:V folder and the
+# launcher's files. path_key is the one way a path becomes a dict key (the
+# I/O queues, the config cache, the install index, the read-ahead manifest
+# and the single-instance address), so a file has the same key everywhere.
+
+import os
+
+ALTV_EXE = 'altv.exe'
+
+
+def path_key(path):
+    return os.path.normcase(os.path.abspath(path))
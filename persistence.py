@@ -0,0 +1,142 @@
+import json
+import os
+import stat
+import tempfile
+import threading
+
+from metrics import metrics
+
+SETTINGS_FILE = 'settings.json'
+
+# The umask can only be read by setting it, which is not thread safe, so it
+# is read once at import
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def atomic_write(path, data):
+    # Write into a temp file next to the target and swap it in, so a crash
+    # mid-write never leaves a truncated file behind. The temp file is
+    # created 0600; it takes over the target's mode, or the umask default
+    # for a new file, so rewriting never changes permissions.
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=f'.{os.path.basename(path)}.', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        try:
+            mode = stat.S_IMODE(os.stat(path).st_mode)
+        except FileNotFoundError:
+            mode = 0o666 & ~_UMASK
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+        metrics.wrote(path, len(data))
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def read_bytes(path):
+    # Whole file content; every read of a config file goes through here so
+    # it shows up in the I/O metrics
+    with open(path, 'rb') as file:
+        data = file.read()
+    metrics.read(path, len(data))
+    return data
+
+
+def read_json_file(path):
+    with open(path, 'r') as file:
+        return json.load(file)
+
+
+def write_json_file(path, data):
+    with open(path, 'w') as file:
+        json.dump(data, file, indent=4)
+
+
+class SettingsWriter:
+    # Write-behind persistence for settings.json. Snapshots are handed over
+    # from the UI thread and serialized on the I/O executor; if several
+    # snapshots arrive while a write is in progress only the newest is kept.
+
+    def __init__(self, path, executor, on_error=None):
+        self.path = path
+        self.executor = executor
+        self.on_error = on_error
+        self.requests = 0   # save requests coming from the UI
+        self.snapshots = 0  # snapshots handed to the executor
+        self.writes = 0     # times settings.json was actually written
+
+        self._cond = threading.Condition()
+        self._pending = None
+        self._scheduled = False  # A write is queued or running
+        self._closed = False
+
+    @property
+    def writes_saved(self):
+        return self.requests - self.writes
+
+    def stats(self):
+        with self._cond:
+            return {
+                'requests': self.requests,
+                'snapshots': self.snapshots,
+                'writes': self.writes,
+                'writes_saved': self.writes_saved,
+            }
+
+    def note_request(self):
+        with self._cond:
+            self.requests += 1
+
+    def submit(self, data):
+        # Returns the future of the write, None when an already queued write
+        # picks up this snapshot
+        with self._cond:
+            if self._closed:
+                return None
+            self.snapshots += 1
+            self._pending = data
+            if self._scheduled:
+                return None  # The queued write picks up the newest snapshot
+            self._scheduled = True
+        return self.executor.submit(self.path, self._write)
+
+    def flush(self, timeout=None):
+        # Block until everything submitted so far is on disk
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._scheduled, timeout)
+
+    def close(self, timeout=None):
+        self.flush(timeout)
+        with self._cond:
+            self._closed = True
+
+    def _write(self):
+        with self._cond:
+            data = self._pending
+            self._pending = None
+
+        try:
+            self._persist(data)
+            with self._cond:
+                self.writes += 1
+        except Exception as e:
+            if self.on_error:
+                self.on_error(f'Failed to save settings: {e}')
+        finally:
+            with self._cond:
+                resubmit = self._pending is not None
+                self._scheduled = resubmit
+                self._cond.notify_all()
+            if resubmit:
+                self.executor.submit(self.path, self._write)
+
+    def _persist(self, data):
+        atomic_write(self.path, json.dumps(data, indent=4).encode('utf-8'))
@@ -0,0 +1,79 @@
+# List model behind the profile browser. It holds only the names of the
+# visible profiles plus a name -> row map; the QListView draws the visible
+# rows only and, with uniform item sizes, never measures the others, so
+# thousands of profiles cost one string per row.
+
+from PyQt5.QtCore import QAbstractListModel, QModelIndex, Qt
+
+
+class ProfileListModel(QAbstractListModel):
+    def __init__(self, profiles, parent=None):
+        super().__init__(parent)
+        self.profiles = profiles  # ProfileStore
+        self.query = ''
+        self.names = []
+        self.rows = {}  # name -> row of the visible profiles
+
+    def set_profiles(self, profiles):
+        self.profiles = profiles
+        self.refresh()
+
+    def set_query(self, query):
+        self.query = query
+        self.refresh()
+
+    def refresh(self):
+        # Re-run the current query, e.g. after many profiles were added at once
+        self.beginResetModel()
+        self.names = self.profiles.search(self.query)
+        self.rows = {name: row for row, name in enumerate(self.names)}
+        self.endResetModel()
+
+    def append(self, name):
+        # A new profile is shown at the end while a query is active too, so
+        # it does not vanish right after being created
+        if name in self.rows:
+            return
+        row = len(self.names)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.names.append(name)
+        self.rows[name] = row
+        self.endInsertRows()
+
+    def remove(self, name):
+        row = self.rows.get(name)
+        if row is None:
+            return
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self.names[row]
+        del self.rows[name]
+        for index in range(row, len(self.names)):
+            self.rows[self.names[index]] = index
+        self.endRemoveRows()
+
+    def row_of(self, name):
+        return self.rows.get(name)
+
+    def name_at(self, row):
+        return self.names[row] if 0 <= row < len(self.names) else None
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.names)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        name = self.names[index.row()]
+        if role == Qt.DisplayRole:
+            return name
+        if role == Qt.ToolTipRole:
+            profile = self.profiles.get(name)
+            if profile is None:
+                return None
+            details = [profile.branch.label]
+            if profile.debug_mode:
+                details.append('debug')
+            if profile.preset is not None:
+                details.append(f'preset {profile.preset}')
+            return f'{name} ({", ".join(details)})'
+        return None
@@ -0,0 +1,150 @@
+# Bulk import and export of profiles. A bundle is a directory of
+# <profile>.json files (the single-profile export format) or a zip archive
+# holding the same files. Archive entries also carry the profile's name, as
+# not every name survives being a file name.
+
+import json
+import os
+import tempfile
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import unquote
+
+from profiles import Profile
+
+BUNDLE_WORKERS = 8
+PROFILE_EXTENSION = '.json'
+PROFILE_NAME_KEY = 'name'
+ENTRY_NAME_UNSAFE = frozenset('%/\\:*?"<>|')
+
+CONFLICT_REPLACE = 'replace'
+CONFLICT_RENAME = 'rename'
+CONFLICT_SKIP = 'skip'
+
+
+def profile_name_for(file_name):
+    # Same naming rule as a single imported file; archive entry names are
+    # unescaped
+    return unquote(os.path.splitext(os.path.basename(file_name))[0])
+
+
+def archive_entry_name(name):
+    # A flat, unique entry name for any profile name
+    escaped = ''.join(f'%{ord(char):02X}' if char in ENTRY_NAME_UNSAFE or ord(char) < 32 else char
+                      for char in name)
+    return escaped + PROFILE_EXTENSION
+
+
+def is_archive(path):
+    return os.path.isfile(path) and zipfile.is_zipfile(path)
+
+
+def _parse_profile(file_name, data):
+    try:
+        data = json.loads(data)
+        name = data.get(PROFILE_NAME_KEY) if isinstance(data, dict) else None
+        if not isinstance(name, str) or not name:
+            name = profile_name_for(file_name)
+        return Profile.from_dict(name, data), None
+    except ValueError as e:
+        return None, f'{os.path.basename(file_name)}: {e}'
+
+
+def _read_and_parse(path):
+    try:
+        with open(path, 'rb') as file:
+            data = file.read()
+    except OSError as e:
+        return None, f'{os.path.basename(path)}: {e}'
+    return _parse_profile(path, data)
+
+
+def _profile_files(directory):
+    return sorted(os.path.join(directory, name) for name in os.listdir(directory)
+                  if name.lower().endswith(PROFILE_EXTENSION))
+
+
+def read_profile_bundle(sources, max_workers=BUNDLE_WORKERS):
+    # Parse profiles from any mix of directories, zip archives and single
+    # .json files; files are read and validated in parallel. Returns
+    # (profiles, errors), profiles in source order without duplicates.
+    jobs = []
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for source in sources:
+            if os.path.isdir(source):
+                jobs.extend(pool.submit(_read_and_parse, path) for path in _profile_files(source))
+            elif is_archive(source):
+                # Members are read here, the archive handle is not shared between threads
+                with zipfile.ZipFile(source) as archive:
+                    for name in sorted(archive.namelist()):
+                        if name.lower().endswith(PROFILE_EXTENSION) and not name.endswith('/'):
+                            jobs.append(pool.submit(_parse_profile, name, archive.read(name)))
+            else:
+                jobs.append(pool.submit(_read_and_parse, source))
+        results = [job.result() for job in jobs]
+
+    profiles = {}
+    errors = []
+    for profile, error in results:
+        if error is not None:
+            errors.append(error)
+        elif profile.name in profiles:
+            errors.append(f'{profile.name}: more than one profile with this name')
+        else:
+            profiles[profile.name] = profile
+    return list(profiles.values()), errors
+
+
+def conflicting_names(profiles, existing):
+    return [profile.name for profile in profiles if profile.name in existing]
+
+
+def unique_name(name, taken):
+    counter = 2
+    while f'{name} ({counter})' in taken:
+        counter += 1
+    return f'{name} ({counter})'
+
+
+def resolve_conflicts(profiles, existing, policy):
+    # Apply one policy to every name clash. Returns (to_add, replaced) where
+    # replaced lists the existing names that to_add overwrites.
+    taken = set(existing)
+    to_add = []
+    replaced = []
+    for profile in profiles:
+        if profile.name in existing:
+            if policy == CONFLICT_SKIP:
+                continue
+            if policy == CONFLICT_REPLACE:
+                replaced.append(profile.name)
+            else:
+                profile = profile.copy()
+                profile.name = unique_name(profile.name, taken)
+        taken.add(profile.name)
+        to_add.append(profile)
+    return to_add, replaced
+
+
+def write_profile_archive(path, profiles_data):
+    # Stream profiles into a zip archive one entry at a time. The archive is
+    # built next to the target and swapped in once complete.
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=f'.{os.path.basename(path)}.', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            with zipfile.ZipFile(file, 'w', zipfile.ZIP_DEFLATED) as archive:
+                for name, data in profiles_data.items():
+                    with archive.open(archive_entry_name(name), 'w') as entry:
+                        entry.write(json.dumps({PROFILE_NAME_KEY: name, **data}, indent=4).encode('utf-8'))
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    return len(profiles_data)
+
@@ -0,0 +1,148 @@
+# In-memory search index over the profiles, used by the profile browser.
+# Profile names are split into words and every profile is tagged with its
+# branch, debug mode, graphics preset and graphics values. Each kind of term
+# lives in a sorted list, so a prefix lookup is a bisect plus a scan over the
+# matching terms, independent of the number of profiles.
+#
+# Query syntax: whitespace separated tokens that must all match.
+#   dev          profile names with a word starting with "dev", followed by
+#                names containing d, e, v in this order (fuzzy)
+#   branch:rc    profiles on the rc branch; field and value are prefixes,
+#                so "shadow:very" matches ShadowQuality "Very High"
+
+import re
+from bisect import bisect_left, insort
+
+from settings_schema import GRAPHICS_SCHEMA
+
+_WORD_RE = re.compile(r'[^\W_]+')
+
+
+def words(text):
+    return _WORD_RE.findall(text.lower())
+
+
+def compact(text):
+    # Value form of a term: "Very High" -> "veryhigh", "MSAA x2" -> "msaax2"
+    return ''.join(words(str(text)))
+
+
+def is_subsequence(token, text):
+    remaining = iter(text)
+    return all(char in remaining for char in token)
+
+
+def profile_tags(profile):
+    # {field: value} terms of a profile besides its name
+    tags = {
+        'branch': profile.branch.label,
+        'debug': 'on' if profile.debug_mode else 'off',
+        'preset': compact(profile.preset) if profile.preset else 'custom',
+    }
+    for setting, code in zip(GRAPHICS_SCHEMA, profile.graphics):
+        tags[setting.key.lower()] = compact(setting.options[code])
+    return tags
+
+
+class TermIndex:
+    # Terms in sorted order, each mapped to the names carrying it
+
+    def __init__(self):
+        self.terms = []
+        self.names = {}  # term -> set of profile names
+
+    def add(self, term, name):
+        names = self.names.get(term)
+        if names is None:
+            names = self.names[term] = set()
+            insort(self.terms, term)
+        names.add(name)
+
+    def remove(self, term, name):
+        names = self.names.get(term)
+        if names is None:
+            return
+        names.discard(name)
+        if not names:
+            del self.names[term]
+            del self.terms[bisect_left(self.terms, term)]
+
+    def prefix(self, prefix):
+        # Names with a term starting with prefix
+        result = set()
+        for position in range(bisect_left(self.terms, prefix), len(self.terms)):
+            term = self.terms[position]
+            if not term.startswith(prefix):
+                break
+            result |= self.names[term]
+        return result
+
+
+class ProfileSearchIndex:
+    def __init__(self):
+        self.name_words = TermIndex()
+        self.fields = {}     # field -> TermIndex of its values
+        self.entries = {}    # name -> (lowercase name, {field: value})
+
+    def update(self, profile):
+        self.remove(profile.name)
+        tags = profile_tags(profile)
+        self.entries[profile.name] = (profile.name.lower(), tags)
+        for word in set(words(profile.name)):
+            self.name_words.add(word, profile.name)
+        for field, value in tags.items():
+            self.fields.setdefault(field, TermIndex()).add(value, profile.name)
+
+    def remove(self, name):
+        entry = self.entries.pop(name, None)
+        if entry is None:
+            return
+        for word in set(words(name)):
+            self.name_words.remove(word, name)
+        for field, value in entry[1].items():
+            self.fields[field].remove(value, name)
+
+    def clear(self):
+        self.name_words = TermIndex()
+        self.fields = {}
+        self.entries = {}
+
+    def match(self, token):
+        # (prefix matches, fuzzy matches) of one query token
+        field, separator, value = token.partition(':')
+        if separator:
+            field = compact(field)
+            value = compact(value)
+            matches = set()
+            for name, index in self.fields.items():
+                if name.startswith(field):
+                    matches |= index.prefix(value)
+            return matches, set()
+        token_words = words(token)
+        if not token_words:
+            return set(self.entries), set()
+        matches = self.name_words.prefix(token_words[0])
+        for word in token_words[1:]:
+            matches &= self.name_words.prefix(word)
+        key = token.lower()
+        fuzzy = {name for name, (lower, _) in self.entries.items()
+                 if name not in matches and is_subsequence(key, lower)}
+        return matches, fuzzy
+
+    def search(self, query, order):
+        # Names in order (an iterable of all names) that match every token,
+        # prefix matches first
+        exact = None
+        fuzzy = set()
+        for token in query.split():
+            matches, approximate = self.match(token)
+            if exact is None:
+                exact, fuzzy = matches, approximate
+            else:
+                # A name is exact only if every token matched it exactly
+                everything = exact | fuzzy
+                exact = exact & matches
+                fuzzy = (everything & (matches | approximate)) - exact
+        if exact is None:
+            return list(order)
+        return [name for name in order if name in exact] + [name for name in order if name in fuzzy]
@@ -0,0 +1,276 @@
+from enum import IntEnum
+
+from graphics_presets import GraphicsPresets, is_preset_id, preset_id
+from profile_search import ProfileSearchIndex
+from settings_schema import GRAPHICS_INDEX, GRAPHICS_SCHEMA, GRAPHICS_SETTINGS
+
+
+class Branch(IntEnum):
+    RELEASE = 0
+    RC = 1
+    DEV = 2
+
+    @property
+    def label(self):
+        return self.name.lower()
+
+    @classmethod
+    def parse(cls, value):
+        try:
+            return cls[str(value).upper()]
+        except KeyError:
+            return cls.RELEASE  # Default
+
+
+BRANCHES = tuple(branch.label for branch in Branch)
+
+
+class Profile:
+    # Compact record of one profile. Graphics values are stored as option
+    # codes (index into the setting's schema options), one byte per setting.
+    # A profile linked to a named preset shares that preset's code array.
+    __slots__ = ('name', 'branch', 'debug_mode', 'graphics', 'preset', 'altv_folder')
+
+    def __init__(self, name, branch=Branch.RELEASE, debug_mode=False, graphics=None, preset=None,
+                 altv_folder=None):
+        self.name = name
+        self.branch = branch
+        self.debug_mode = debug_mode
+        self.graphics = bytearray(len(GRAPHICS_SETTINGS)) if graphics is None else bytearray(graphics)
+        self.preset = preset  # Name of the linked graphics preset, None if the profile has its own
+        self.altv_folder = altv_folder  # alt:V folder of this profile, None for the global one
+
+    @classmethod
+    def from_dict(cls, name, data):
+        if not isinstance(data, dict):
+            raise ValueError(f'profile "{name}" must be a JSON object')
+        profile = cls(name, Branch.parse(data.get('branch', 'release')), bool(data.get('debug_mode', False)))
+        preset = data.get('graphics_preset')
+        if isinstance(preset, str):
+            profile.preset = preset
+        altv_folder = data.get('altv_folder')
+        if isinstance(altv_folder, str) and altv_folder:
+            profile.altv_folder = altv_folder
+        graphics_settings = data.get('graphics_settings', {})
+        if isinstance(graphics_settings, dict):
+            for setting, value in graphics_settings.items():
+                profile.set_graphics_value(setting, value)
+        return profile
+
+    def copy(self):
+        # The copy gets its own code array, even when the profile is linked
+        return Profile(self.name, self.branch, self.debug_mode, self.graphics, self.preset, self.altv_folder)
+
+    def to_dict(self):
+        # Self-contained form, used for exported profile files
+        data = {
+            'branch': self.branch.label,
+            'debug_mode': self.debug_mode,
+            'graphics_settings': self.graphics_settings()
+        }
+        if self.preset is not None:
+            data['graphics_preset'] = self.preset
+        if self.altv_folder:
+            data['altv_folder'] = self.altv_folder
+        return data
+
+    def preset_reference(self):
+        return self.preset if self.preset is not None else preset_id(self.graphics)
+
+    def to_stored_dict(self):
+        # settings.json form: the graphics are a reference into graphics_presets
+        data = {
+            'branch': self.branch.label,
+            'debug_mode': self.debug_mode,
+            'graphics_preset': self.preset_reference()
+        }
+        if self.altv_folder:
+            data['altv_folder'] = self.altv_folder
+        return data
+
+    def graphics_settings(self):
+        return {setting: self.graphics_value(setting) for setting in GRAPHICS_SETTINGS}
+
+    def graphics_value(self, setting):
+        index = GRAPHICS_INDEX[setting]
+        return GRAPHICS_SCHEMA[index].options[self.graphics[index]]
+
+    def set_graphics_value(self, setting, value):
+        # Unknown settings or values are ignored, the option keeps its current code
+        index = GRAPHICS_INDEX.get(setting)
+        if index is not None:
+            code = GRAPHICS_SCHEMA[index].codes.get(value)
+            if code is not None:
+                self.graphics[index] = code
+
+    def set_graphics_code(self, setting, code):
+        index = GRAPHICS_INDEX[setting]
+        if 0 <= code < len(GRAPHICS_SCHEMA[index].options):
+            self.graphics[index] = code
+
+
+class ProfileStore:
+    # Source of truth for all profiles and graphics presets. Edits mark single
+    # profiles dirty so serialization only re-renders what changed since the
+    # last call.
+
+    def __init__(self):
+        self._profiles = {}
+        self._serialized = {}
+        self.dirty = set()
+        self.presets = GraphicsPresets()
+        self._references = {}       # preset id -> [profiles using it, codes]
+        self._presets_data = None   # Cached presets_dict() result
+        self.search_index = ProfileSearchIndex()
+        self._unindexed = set()     # Profiles changed since they were last indexed
+        self.unresolved = []        # Profiles whose preset was missing in the last load
+
+    @classmethod
+    def from_dict(cls, profiles_data, presets_data=None):
+        store = cls()
+        store.load(profiles_data, presets_data)
+        return store
+
+    def load(self, profiles_data, presets_data=None):
+        # profiles_data may hold inline graphics_settings (older settings.json
+        # files, exported profiles) or references into presets_data
+        self._profiles = {}
+        self._serialized = {}
+        self.dirty = set()
+        self._references = {}
+        self._presets_data = None
+        self.search_index.clear()
+        self._unindexed = set()
+        self.unresolved = []
+        self.presets.load(presets_data)
+        for name, data in profiles_data.items():
+            profile = Profile.from_dict(name, data)
+            resolved = self.presets.resolve(profile.preset) if profile.preset is not None else None
+            if resolved is not None:
+                profile.graphics, profile.preset = resolved
+            elif profile.preset is not None and 'graphics_settings' not in data:
+                # Nothing to take the graphics from, they are the defaults now
+                self.unresolved.append(name)
+            self.add(profile)
+
+    def add(self, profile):
+        # A profile naming a preset stays linked only if it still matches it
+        if profile.preset is not None:
+            shared = self.presets.named.get(profile.preset)
+            if shared is not None and shared == profile.graphics:
+                profile.graphics = shared
+            else:
+                profile.preset = None
+        self._profiles[profile.name] = profile
+        self.mark_dirty(profile.name)
+
+    def mark_dirty(self, name):
+        self.dirty.add(name)
+        self._unindexed.add(name)
+        self._presets_data = None
+
+    def get(self, name, default=None):
+        return self._profiles.get(name, default)
+
+    def names(self):
+        return list(self._profiles)
+
+    def linked_profiles(self, preset):
+        return [profile for profile in self._profiles.values() if profile.preset == preset]
+
+    def create_preset(self, name, profile):
+        # Turn a profile's graphics into a named preset and link the profile to it
+        profile.graphics = self.presets.create(name, profile.graphics)
+        profile.preset = name
+        self.mark_dirty(profile.name)
+
+    def link_preset(self, profile, name):
+        # name None detaches the profile, keeping a copy of the current values
+        if name is None:
+            profile.graphics = bytearray(profile.graphics)
+        else:
+            profile.graphics = self.presets.named[name]
+        profile.preset = name
+        self.mark_dirty(profile.name)
+
+    def mark_preset_dirty(self):
+        # A named preset was edited; linked profiles are unaffected on disk
+        # but their graphics values have to be indexed again
+        self._presets_data = None
+        self._unindexed.update(name for name, profile in self._profiles.items() if profile.preset is not None)
+
+    def search(self, query):
+        # Names of the profiles matching query (see profile_search), in store
+        # order with prefix matches first. Changed profiles are indexed here,
+        # so edits and loading never pay for the index.
+        if not query.split():
+            return self.names()
+        for name in self._unindexed:
+            profile = self._profiles.get(name)
+            if profile is not None:
+                self.search_index.update(profile)
+        self._unindexed.clear()
+        return self.search_index.search(query, self._profiles)
+
+    def _release(self, name):
+        # Drop the preset reference held by a profile's serialized form
+        reference = self._serialized.get(name, {}).get('graphics_preset')
+        entry = self._references.get(reference)
+        if entry is not None:
+            entry[0] -= 1
+            if not entry[0]:
+                del self._references[reference]
+
+    def _refresh(self):
+        for name in self.dirty:
+            profile = self._profiles.get(name)
+            if profile is None:
+                continue
+            self._release(name)
+            data = self._serialized[name] = profile.to_stored_dict()
+            reference = data['graphics_preset']
+            if is_preset_id(reference):
+                entry = self._references.setdefault(reference, [0, bytes(profile.graphics)])
+                entry[0] += 1
+        self.dirty.clear()
+
+    def to_dict(self):
+        # settings.json form of all profiles. Serialized dicts are never
+        # mutated after creation, so the result is safe to hand to another
+        # thread and unchanged profiles keep returning the same object.
+        self._refresh()
+        return {name: self._serialized[name] for name in self._profiles}
+
+    def presets_dict(self):
+        # settings.json form of the presets: every named preset plus the
+        # content-addressed configurations profiles currently use
+        self._refresh()
+        if self._presets_data is None:
+            references = {reference: codes for reference, (_, codes) in self._references.items()}
+            self._presets_data = self.presets.to_dict(references)
+        return self._presets_data
+
+    def export_dict(self):
+        # Self-contained form of all profiles, as written by profile export
+        return {name: profile.to_dict() for name, profile in self._profiles.items()}
+
+    def __getitem__(self, name):
+        return self._profiles[name]
+
+    def __delitem__(self, name):
+        del self._profiles[name]
+        self.search_index.remove(name)
+        self._unindexed.discard(name)
+        self._release(name)
+        self._serialized.pop(name, None)
+        self.dirty.discard(name)
+        self._presets_data = None
+
+    def __contains__(self, name):
+        return name in self._profiles
+
+    def __iter__(self):
+        return iter(self._profiles)
+
+    def __len__(self):
+        return len(self._profiles)
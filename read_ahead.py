@@ -0,0 +1,262 @@
+# Read-ahead of the client's files. While the user is still picking a
+# profile, the files under the alt:V folder are pulled into the OS page cache
+# on a background thread, so the client's cold start reads them from memory
+# instead of the disk. Files that were hot in earlier launches go first, then
+# binaries, then resource and cache files, until a byte budget is used up.
+#
+# Where the platform has posix_fadvise, the kernel is asked to read the
+# files (POSIX_FADV_WILLNEED) and no data is copied into Python; elsewhere
+# (Windows) the files are read in large chunks into a reused buffer.
+#
+# Which files are hot is learned after each launch: files under the folder
+# whose access or modification time is newer than the client's start were
+# used by it. Access times are best effort (noatime, relatime, NTFS with
+# last access updates disabled); without them the static order is used.
+
+import json
+import os
+import threading
+import time
+
+from metrics import metrics
+from paths import path_key
+from persistence import atomic_write
+
+READ_AHEAD_MANIFEST_FILE = 'read_ahead.json'
+DEFAULT_BUDGET_MB = 512
+CHUNK_SIZE = 1024 * 1024
+WARM_TTL_SECONDS = 30 * 60  # A warm-up older than this no longer counts, the cache may have been evicted
+ACCESS_SLACK_SECONDS = 2  # Timestamp granularity of FAT and friends
+MANIFEST_VERSION = 1
+MANIFEST_MAX_FILES = 2000  # Hot files remembered per folder
+MANIFEST_KEEP_LAUNCHES = 10  # Hot files not seen in this many launches are forgotten
+
+BINARY_EXTENSIONS = frozenset({'.exe', '.dll', '.node', '.so', '.pak', '.bin'})
+SKIPPED_EXTENSIONS = frozenset({'.log', '.dmp', '.tmp'})
+SKIPPED_DIRS = frozenset({'logs', 'crashdumps'})
+
+METHOD = 'fadvise' if hasattr(os, 'posix_fadvise') else 'read'
+
+
+def client_files(folder):
+    # [(relative path, size)] of the files worth warming under folder
+    files = []
+    for root, dirs, names in os.walk(folder):
+        dirs[:] = [name for name in dirs if not name.startswith('.') and name.lower() not in SKIPPED_DIRS]
+        for name in names:
+            if os.path.splitext(name)[1].lower() in SKIPPED_EXTENSIONS:
+                continue
+            path = os.path.join(root, name)
+            try:
+                size = os.path.getsize(path)
+            except OSError:
+                continue
+            if size:
+                files.append((os.path.relpath(path, folder), size))
+    return files
+
+
+class ReadAheadManifest:
+    # Persisted per folder: the launches recorded so far and, per hot file,
+    # [times seen, launch it was last seen in]
+
+    def __init__(self, path=READ_AHEAD_MANIFEST_FILE):
+        self.path = path
+        self.folders = {}
+
+    def load(self):
+        try:
+            with open(self.path, 'r') as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return self
+        if isinstance(data, dict) and data.get('version') == MANIFEST_VERSION:
+            folders = data.get('folders')
+            self.folders = folders if isinstance(folders, dict) else {}
+        return self
+
+    def save(self):
+        data = {'version': MANIFEST_VERSION, 'folders': self.folders}
+        try:
+            atomic_write(self.path, json.dumps(data, separators=(',', ':')).encode('utf-8'))
+        except OSError:
+            pass  # The manifest is only an optimization
+
+    def hot_files(self, folder):
+        # Relative paths, most often seen first
+        entry = self.folders.get(path_key(folder))
+        if not entry:
+            return []
+        files = entry['files']
+        return sorted(files, key=lambda name: -files[name][0])
+
+    def record(self, folder, names):
+        # One launch that used names (relative paths)
+        entry = self.folders.setdefault(path_key(folder), {'launches': 0, 'files': {}})
+        entry['launches'] += 1
+        launch = entry['launches']
+        files = entry['files']
+        for name in names:
+            seen = files.get(name)
+            files[name] = [seen[0] + 1 if seen else 1, launch]
+        for name in [name for name, (_, last) in files.items() if launch - last >= MANIFEST_KEEP_LAUNCHES]:
+            del files[name]
+        if len(files) > MANIFEST_MAX_FILES:
+            keep = sorted(files, key=lambda name: (-files[name][1], -files[name][0]))[:MANIFEST_MAX_FILES]
+            entry['files'] = {name: files[name] for name in keep}
+
+
+def plan_read_ahead(folder, budget, hot_files=()):
+    # [(path, bytes to read)] in warm-up order, within budget bytes. The last
+    # file may only be warmed in part.
+    files = client_files(folder)
+    sizes = dict(files)
+    rank = {name: position for position, name in enumerate(hot_files) if name in sizes}
+
+    def order(item):
+        name, size = item
+        if name in rank:
+            return (0, rank[name], 0)
+        binary = os.path.splitext(name)[1].lower() in BINARY_EXTENSIONS
+        return (1 if binary else 2, size, name)  # Small files first, they cost a seek each
+
+    plan = []
+    for name, size in sorted(files, key=order):
+        if budget <= 0:
+            break
+        length = min(size, budget)
+        plan.append((os.path.join(folder, name), length))
+        budget -= length
+    return plan
+
+
+def prefetch(path, length, cancelled=None, buffer=None):
+    # Bring the first length bytes of path into the page cache. Returns the
+    # bytes covered.
+    with open(path, 'rb', buffering=0) as file:
+        if METHOD == 'fadvise':
+            os.posix_fadvise(file.fileno(), 0, length, os.POSIX_FADV_WILLNEED)
+            return length
+        view = memoryview(buffer if buffer is not None else bytearray(CHUNK_SIZE))
+        remaining = length
+        while remaining > 0 and not (cancelled is not None and cancelled.is_set()):
+            count = file.readinto(view[:min(len(view), remaining)])
+            if not count:
+                break
+            remaining -= count
+        return length - remaining
+
+
+class ReadAheadResult:
+    __slots__ = ('folder', 'files', 'bytes', 'seconds', 'complete', 'finished_at')
+
+    def __init__(self, folder, files, nbytes, seconds, complete):
+        self.folder = folder
+        self.files = files        # Files warmed, in full or in part
+        self.bytes = nbytes
+        self.seconds = seconds
+        self.complete = complete  # False when cancelled
+        self.finished_at = time.time()
+
+
+def warm_folder(folder, budget, manifest_path=READ_AHEAD_MANIFEST_FILE, cancelled=None):
+    began = time.perf_counter()
+    hot_files = ReadAheadManifest(manifest_path).load().hot_files(folder)
+    buffer = bytearray(CHUNK_SIZE) if METHOD == 'read' else None
+    files = nbytes = 0
+    complete = True
+    for path, length in plan_read_ahead(folder, budget, hot_files):
+        if cancelled is not None and cancelled.is_set():
+            complete = False
+            break
+        try:
+            nbytes += prefetch(path, length, cancelled, buffer)
+        except OSError:
+            continue  # Locked or vanished; the client will read it itself
+        files += 1
+    if cancelled is not None and cancelled.is_set():
+        complete = False
+    return ReadAheadResult(folder, files, nbytes, round(time.perf_counter() - began, 3), complete)
+
+
+def used_since(folder, since):
+    # Relative paths under folder accessed or modified after since (time.time())
+    since -= ACCESS_SLACK_SECONDS
+    used = []
+    for name, _ in client_files(folder):
+        try:
+            stat = os.stat(os.path.join(folder, name))
+        except OSError:
+            continue
+        if max(stat.st_atime, stat.st_mtime) >= since:
+            used.append(name)
+    return used
+
+
+def record_hot_files(folder, since, manifest_path=READ_AHEAD_MANIFEST_FILE):
+    # Learn from a finished launch. A launch that seems to have touched
+    # nothing is not recorded, the file system does not track access then.
+    # Returns the number of hot files found.
+    used = used_since(folder, since)
+    if used:
+        manifest = ReadAheadManifest(manifest_path).load()
+        manifest.record(folder, used)
+        manifest.save()
+    return len(used)
+
+
+class ReadAheadWarmer:
+    # Runs one warm-up at a time on its own thread; starting another one
+    # cancels the running one. on_done receives the ReadAheadResult on the
+    # warmer's thread.
+
+    def __init__(self, manifest_path=READ_AHEAD_MANIFEST_FILE, on_done=None):
+        self.manifest_path = manifest_path
+        self.on_done = on_done
+        self.last = None  # ReadAheadResult of the last finished warm-up
+        self.folder = None  # Folder and budget of the current or last warm-up
+        self.budget = None
+        self._cancelled = None
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def is_warm(self, folder):
+        last = self.last
+        return (last is not None and last.complete and path_key(last.folder) == path_key(folder)
+                and time.time() - last.finished_at < WARM_TTL_SECONDS)
+
+    def ensure_warm(self, folder, budget):
+        # Start a warm-up of folder unless it is warm or being warmed with
+        # this budget already. Returns whether one was started.
+        if self.budget == budget and (self.is_warm(folder) or
+                                      self.running and path_key(self.folder) == path_key(folder)):
+            return False
+        self.start(folder, budget)
+        return True
+
+    def start(self, folder, budget):
+        self.cancel()
+        self.folder = folder
+        self.budget = budget
+        cancelled = self._cancelled = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(folder, budget, cancelled),
+                                        name='read-ahead', daemon=True)
+        self._thread.start()
+
+    def _run(self, folder, budget, cancelled):
+        with metrics.operation('read_ahead'):
+            result = warm_folder(folder, budget, self.manifest_path, cancelled)
+        if cancelled.is_set():
+            return  # Superseded, or the launcher is closing
+        self.last = result
+        if self.on_done is not None:
+            self.on_done(result)
+
+    def cancel(self, wait=False):
+        if self._cancelled is not None:
+            self._cancelled.set()
+        if wait and self._thread is not None:
+            self._thread.join()
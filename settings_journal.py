@@ -0,0 +1,252 @@
+# Journaled storage for settings.json. Instead of rewriting the whole
+# document on every change, edits are appended to a small journal next to it
+# as one compact JSON line per changed profile. Loading replays the journal
+# over settings.json, and once the journal grows past a threshold (and on
+# close) it is compacted back into settings.json, which keeps its usual
+# layout and can still be copied, imported or edited by hand.
+#
+# Journal records, one per line:
+#   ["p", name, profile_dict]   profile added or changed
+#   ["d", name]                 profile deleted
+#   ["g", reference, values]    graphics preset added or changed
+#   ["gd", reference]           graphics preset no longer used
+#   ["m", key, value]           top-level setting (altv_folder, ...)
+# Every record is absolute, so replaying a journal over a snapshot that
+# already contains it (a crash between compaction and truncation) is harmless.
+# Presets are journaled before the profiles that start using them and
+# dropped after the profiles that stopped, so a journal cut short by a crash
+# never leaves a profile pointing at a preset it does not contain.
+
+import json
+import os
+import time
+
+from metrics import metrics
+from persistence import SettingsWriter, atomic_write, read_bytes
+
+COMPACT_JOURNAL_BYTES = 256 * 1024
+COMPACT_JOURNAL_RECORDS = 2000
+
+
+def journal_path_for(settings_path):
+    return os.path.splitext(settings_path)[0] + '.journal'
+
+
+def backup_path_for(settings_path):
+    root, extension = os.path.splitext(settings_path)
+    return f'{root}.broken-{time.strftime("%Y%m%d-%H%M%S")}{extension}'
+
+
+def _encode_record(record):
+    return json.dumps(record, separators=(',', ':')).encode('utf-8') + b'\n'
+
+
+def read_journal(journal_path):
+    # Returns (records, valid_length). A torn last line left by a crash is
+    # not part of valid_length.
+    try:
+        data = read_bytes(journal_path)
+    except FileNotFoundError:
+        return [], 0
+
+    records = []
+    offset = 0
+    for line in data.splitlines(keepends=True):
+        if not line.endswith(b'\n'):
+            break
+        try:
+            record = json.loads(line)
+        except ValueError:
+            break
+        records.append(record)
+        offset += len(line)
+    return records, offset
+
+
+def replay_journal(data, records):
+    profiles = data.setdefault('profiles', {})
+    for record in records:
+        kind = record[0]
+        if kind == 'p':
+            profiles[record[1]] = record[2]
+        elif kind == 'd':
+            profiles.pop(record[1], None)
+        elif kind == 'g':
+            presets = data.get('graphics_presets')
+            if not isinstance(presets, dict):
+                presets = data['graphics_presets'] = {}
+            presets[record[1]] = record[2]
+        elif kind == 'gd':
+            presets = data.get('graphics_presets')
+            if isinstance(presets, dict):
+                presets.pop(record[1], None)
+        elif kind == 'm':
+            data[record[1]] = record[2]
+    return data
+
+
+def _snapshot(data):
+    # Shallow copy that keeps the key order of settings.json
+    snapshot = dict(data)
+    snapshot['profiles'] = dict(data.get('profiles', {}))
+    if isinstance(data.get('graphics_presets'), dict):
+        snapshot['graphics_presets'] = dict(data['graphics_presets'])
+    return snapshot
+
+
+def load_settings(settings_path, journal_path=None):
+    # settings.json with the journal applied, or None if neither exists
+    journal_path = journal_path or journal_path_for(settings_path)
+    try:
+        data = json.loads(read_bytes(settings_path))
+    except FileNotFoundError:
+        data = None
+    records, _ = read_journal(journal_path)
+    if data is None and not records:
+        return None
+    return replay_journal(data if data is not None else {}, records)
+
+
+class JournaledSettingsWriter(SettingsWriter):
+    # Drop-in replacement for SettingsWriter: snapshots are diffed against
+    # what is already persisted and only the difference is appended.
+    # ProfileStore.to_dict() hands out the same dict object for an unchanged
+    # profile, so most profiles are skipped by an identity check.
+
+    def __init__(self, path, executor, on_error=None, journal_path=None,
+                 compact_bytes=COMPACT_JOURNAL_BYTES, compact_records=COMPACT_JOURNAL_RECORDS):
+        super().__init__(path, executor, on_error)
+        self.journal_path = journal_path or journal_path_for(path)
+        self.compact_bytes = compact_bytes
+        self.compact_records = compact_records
+        self.bytes_appended = 0
+        self.records_appended = 0
+        self.compactions = 0
+
+        self.backup_path = None  # Where an unreadable settings.json was moved by load()
+        self._state = None  # What settings.json plus the journal hold
+        self._journal_size = 0
+        self._journal_records = 0
+
+    def stats(self):
+        stats = super().stats()
+        with self._cond:
+            stats.update({
+                'bytes_appended': self.bytes_appended,
+                'records_appended': self.records_appended,
+                'compactions': self.compactions,
+                'journal_bytes': self._journal_size,
+            })
+        return stats
+
+    def load(self):
+        # Read settings.json and replay the journal. Must run before the first
+        # submit, on the executor queue of self.path. A settings.json that is
+        # not valid JSON is moved aside to backup_path and treated as missing,
+        # so the next save does not overwrite what may still be recovered.
+        broken = False
+        try:
+            data = json.loads(read_bytes(self.path))
+            broken = not isinstance(data, dict)
+        except FileNotFoundError:
+            data = None
+        except ValueError:
+            broken = True
+        if broken:
+            self.backup_path = backup_path_for(self.path)
+            os.replace(self.path, self.backup_path)
+            data = None
+        records, valid_length = read_journal(self.journal_path)
+        if valid_length != self._file_size(self.journal_path):
+            with open(self.journal_path, 'r+b') as file:
+                file.truncate(valid_length)
+
+        state = replay_journal(data if data is not None else {}, records)
+        self._state = _snapshot(state)
+        self._journal_size = valid_length
+        self._journal_records = len(records)
+        if data is None and not records:
+            return None
+        return state
+
+    def _file_size(self, path):
+        try:
+            return os.path.getsize(path)
+        except FileNotFoundError:
+            return 0
+
+    def _diff(self, data):
+        if self._state is None:
+            self._state = {'profiles': {}}
+        records = []
+        persisted_presets = self._state.get('graphics_presets')
+        if not isinstance(persisted_presets, dict):
+            persisted_presets = {}
+        presets = data.get('graphics_presets', {})
+        for reference, values in presets.items():
+            if persisted_presets.get(reference) != values:
+                records.append(['g', reference, values])
+        persisted = self._state['profiles']
+        profiles = data.get('profiles', {})
+        for name, profile in profiles.items():
+            current = persisted.get(name)
+            if current is not profile and current != profile:
+                records.append(['p', name, profile])
+        for name in persisted:
+            if name not in profiles:
+                records.append(['d', name])
+        for reference in persisted_presets:
+            if reference not in presets:
+                records.append(['gd', reference])
+        for key, value in data.items():
+            if key not in ('profiles', 'graphics_presets') and self._state.get(key) != value:
+                records.append(['m', key, value])
+        return records
+
+    def _persist(self, data):
+        records = self._diff(data)
+        if records:
+            chunk = b''.join(_encode_record(record) for record in records)
+            with open(self.journal_path, 'ab') as file:
+                file.write(chunk)
+                file.flush()
+                os.fsync(file.fileno())
+            metrics.wrote(self.journal_path, len(chunk))
+            with self._cond:
+                self.bytes_appended += len(chunk)
+                self.records_appended += len(records)
+            self._journal_size += len(chunk)
+            self._journal_records += len(records)
+
+        self._state = _snapshot(data)
+
+        if self._journal_size >= self.compact_bytes or self._journal_records >= self.compact_records:
+            self._compact()
+
+    def _compact(self):
+        # Fold the journal into settings.json. Runs on the executor, in order
+        # with the appends.
+        atomic_write(self.path, json.dumps(self._state, indent=4).encode('utf-8'))
+        with open(self.journal_path, 'wb'):
+            pass
+        self._journal_size = 0
+        self._journal_records = 0
+        with self._cond:
+            self.compactions += 1
+
+    def compact(self):
+        # Queue a compaction behind the pending appends
+        return self.executor.submit(self.path, self._compact_if_needed)
+
+    def _compact_if_needed(self):
+        if self._state is not None and (self._journal_records or not os.path.exists(self.path)):
+            self._compact()
+
+    def close(self, timeout=None):
+        super().close(timeout)
+        # Leave a complete settings.json behind
+        try:
+            self.compact().result(timeout)
+        except Exception as e:
+            if self.on_error:
+                self.on_error(f'Failed to save settings: {e}')
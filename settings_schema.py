@@ -0,0 +1,74 @@
+# Declarative description of every setting a profile controls. Each entry is
+# compiled once at import into the lookup tables used by the UI, the profile
+# model (validation and option codes) and the settings.xml / altv.toml writers.
+# Exposing another settings.xml key is a matter of adding one entry here.
+
+
+def encode_value(setting, option):
+    return [((setting.section, setting.tag), setting.values[option])]
+
+
+def encode_anti_aliasing(setting, option):
+    # FXAA and MSAA are separate switches in settings.xml
+    return [
+        ((setting.section, 'MSAA'), setting.values[option]),
+        ((setting.section, 'FXAA_Enabled'), 'true' if option == 'FXAA' else 'false'),
+    ]
+
+
+class GraphicsSetting:
+    __slots__ = ('key', 'label', 'tooltip', 'section', 'tag', 'values', 'options', 'codes', 'encoded')
+
+    def __init__(self, key, section, tag, values, encoder=encode_value, label=None):
+        self.key = key
+        self.label = label or key.replace('Quality', ' Quality')
+        self.tooltip = f'Select the {key.replace("Quality", " quality").lower()}.'
+        self.section = section
+        self.tag = tag
+        self.values = values  # UI option -> value written to settings.xml
+
+        # Compiled lookups: option code <-> UI option, and for every option
+        # code the ((section, tag), value) pairs it writes
+        self.options = tuple(values)
+        self.codes = {option: code for code, option in enumerate(self.options)}
+        self.encoded = tuple(tuple(encoder(self, option)) for option in self.options)
+
+
+QUALITY = {'Normal': '0', 'High': '1', 'Very High': '2'}
+
+GRAPHICS_SCHEMA = (
+    GraphicsSetting('TextureQuality', 'graphics', 'TextureQuality', QUALITY),
+    GraphicsSetting('ShaderQuality', 'graphics', 'ShaderQuality', QUALITY),
+    GraphicsSetting('ShadowQuality', 'graphics', 'ShadowQuality', QUALITY),
+    GraphicsSetting('ReflectionQuality', 'graphics', 'ReflectionQuality', QUALITY),
+    GraphicsSetting('WaterQuality', 'graphics', 'WaterQuality', QUALITY),
+    GraphicsSetting('GrassQuality', 'graphics', 'GrassQuality', {**QUALITY, 'Ultra': '3'}),
+    GraphicsSetting('AnisotropicFiltering', 'graphics', 'AnisotropicFiltering',
+                    {'Off': '0', 'x2': '2', 'x4': '4', 'x8': '8', 'x16': '16'}),
+    GraphicsSetting('AmbientOcclusion', 'graphics', 'SSAO', {'Off': '0', 'Normal': '1', 'High': '2'}),
+    GraphicsSetting('AntiAliasing', 'graphics', 'MSAA',
+                    {'Off': '0', 'FXAA': '0', 'MSAA x2': '2', 'MSAA x4': '4', 'MSAA x8': '8'},
+                    encoder=encode_anti_aliasing),
+    GraphicsSetting('VSync', 'video', 'VSync', {'Off': '0', 'On': '1'}),
+)
+
+GRAPHICS_SETTINGS = tuple(setting.key for setting in GRAPHICS_SCHEMA)
+GRAPHICS_INDEX = {key: index for index, key in enumerate(GRAPHICS_SETTINGS)}
+GRAPHICS_OPTIONS = {setting.key: setting.options for setting in GRAPHICS_SCHEMA}
+XML_SECTIONS = tuple(dict.fromkeys(section for setting in GRAPHICS_SCHEMA
+                                   for encoded in setting.encoded for (section, _), _ in encoded))
+
+
+class TomlSetting:
+    __slots__ = ('attribute', 'key', 'encode')
+
+    def __init__(self, attribute, key, encode):
+        self.attribute = attribute  # Profile attribute the value comes from
+        self.key = key              # Top-level key in altv.toml
+        self.encode = encode
+
+
+TOML_SCHEMA = (
+    TomlSetting('debug_mode', 'debug', bool),
+    TomlSetting('branch', 'branch', lambda branch: branch.label),
+)
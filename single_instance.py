@@ -0,0 +1,139 @@
+# Single-instance hand-off. The launcher window listens on a local socket
+# (a Unix domain socket, or a named pipe on Windows) whose address is derived
+# from its settings.json. A later invocation sends its request there as one
+# JSON line and gets one JSON line back, then exits: repeat launches skip the
+# startup entirely, and one process owns all writes to settings.json and the
+# game config files. This side never imports PyQt5; the window's end is
+# instance_server.py.
+#
+# Requests: {"action": "show"}, {"action": "launch" | "apply", "profile": name
+# or null for the selected one}, {"action": "multi_launch", "profiles": [...],
+# "copies": n}. Replies: {"ok": true, "message": ..., "warnings": [...]} or
+# {"ok": false, "error": ...}, sent once the request has been carried out.
+
+import hashlib
+import json
+import os
+import socket
+import sys
+
+from multi_launch import INSTANCES_DIR
+from paths import path_key
+from persistence import SETTINGS_FILE
+
+INSTANCE_NAME_PREFIX = 'altv-easy-launch-'
+CONNECT_TIMEOUT = 1.0
+REPLY_TIMEOUT = 120.0  # The window answers once its settings are loaded and the request is done
+MAX_MESSAGE_BYTES = 64 * 1024
+
+
+def server_address(settings_path=SETTINGS_FILE):
+    # One instance per settings file and user
+    key = path_key(settings_path)
+    if hasattr(os, 'getuid'):
+        key = f'{os.getuid()}:{key}'
+    name = INSTANCE_NAME_PREFIX + hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+    if os.name == 'nt':
+        return rf'\\.\pipe\{name}'
+    import tempfile
+    return os.path.join(tempfile.gettempdir(), f'{name}.sock')
+
+
+def encode_message(message):
+    return (json.dumps(message) + '\n').encode('utf-8')
+
+
+def decode_message(line):
+    message = json.loads(line.decode('utf-8'))
+    if not isinstance(message, dict):
+        raise ValueError('Expected a JSON object.')
+    return message
+
+
+def request_from_args(args):
+    # The request a running window should handle for these arguments, or
+    # None when they are handled right here
+    if args.list or args.find_altv or args.altv_folder:
+        return None  # Read-only, or aimed at another alt:V folder than the window's
+    if args.launch or args.apply_only:
+        return {'action': 'launch' if args.launch else 'apply', 'profile': args.profile}
+    if args.multi_launch:
+        if args.report or path_key(args.instances_dir) != path_key(INSTANCES_DIR):
+            return None  # The report and other instance folders are only available here
+        return {'action': 'multi_launch', 'profiles': args.multi_launch, 'copies': args.instances}
+    return {'action': 'show'}
+
+
+def _allow_foreground():
+    # Let the running window take the focus from this console
+    if os.name == 'nt':
+        import ctypes
+        ASFW_ANY = -1
+        ctypes.windll.user32.AllowSetForegroundWindow(ASFW_ANY)
+
+
+def send_request(request, address):
+    # The running instance's reply, or None when no instance listens at address
+    data = encode_message(request)
+    if os.name == 'nt':
+        try:
+            pipe = open(address, 'r+b', buffering=0)
+        except OSError:
+            return None
+        with pipe:
+            _allow_foreground()
+            pipe.write(data)
+            line = pipe.readline(MAX_MESSAGE_BYTES)
+    else:
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        connection.settimeout(CONNECT_TIMEOUT)
+        try:
+            connection.connect(address)
+        except OSError:
+            connection.close()
+            return None
+        with connection:
+            connection.settimeout(REPLY_TIMEOUT)
+            connection.sendall(data)
+            with connection.makefile('rb') as reader:
+                line = reader.readline(MAX_MESSAGE_BYTES)
+    if not line:
+        raise OSError('The running launcher closed the connection without replying.')
+    return decode_message(line)
+
+
+def is_listening(address):
+    # Whether a launcher answers at address; a socket file left behind by a
+    # crashed launcher does not
+    if os.name == 'nt':
+        try:
+            open(address, 'r+b', buffering=0).close()
+        except OSError:
+            return False
+        return True
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.settimeout(CONNECT_TIMEOUT)
+        try:
+            connection.connect(address)
+        except OSError:
+            return False
+    return True
+
+
+def forward_request(request, settings_path=SETTINGS_FILE):
+    # Hand request to the running launcher and print its reply. Returns the
+    # exit code, or None when no launcher is running.
+    try:
+        reply = send_request(request, server_address(settings_path))
+    except (OSError, ValueError) as e:
+        print(f'error: Failed to reach the running launcher: {e}', file=sys.stderr)
+        return 1
+    if reply is None:
+        return None
+    if reply.get('ok'):
+        print(reply.get('message', ''))
+        for warning in reply.get('warnings') or ():
+            print(f'warning: {warning}', file=sys.stderr)
+        return 0
+    print(f'error: {reply.get("error", "unknown error")}', file=sys.stderr)
+    return 1
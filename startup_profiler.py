@@ -0,0 +1,184 @@
+# Opt-in startup instrumentation. Enabled with --profile-startup or the
+# ALTV_LAUNCHER_STARTUP_PROFILE environment variable; it timestamps every
+# startup phase from process creation to the first painted window and writes
+# a JSON report that can be compared across builds. When disabled every hook
+# is a cheap no-op.
+
+import json
+import os
+import platform
+import sys
+import time
+from contextlib import contextmanager
+
+STARTUP_PROFILE_ENV = 'ALTV_LAUNCHER_STARTUP_PROFILE'
+STARTUP_PROFILE_FILE = 'startup_profile.json'
+REPORT_VERSION = 1
+
+
+def process_start_time(pid=None):
+    # Wall-clock creation time of a process (this one by default), or None
+    pid = os.getpid() if pid is None else pid
+    try:
+        if os.name == 'nt':
+            return _windows_process_start_time(pid)
+        return _linux_process_start_time(pid)
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _windows_process_start_time(pid):
+    import ctypes
+    from ctypes import wintypes
+
+    PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+    kernel32 = ctypes.windll.kernel32
+    handle = kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+    if not handle:
+        return None
+    try:
+        creation, exit_, kernel, user = (wintypes.FILETIME() for _ in range(4))
+        if not kernel32.GetProcessTimes(handle, ctypes.byref(creation), ctypes.byref(exit_),
+                                        ctypes.byref(kernel), ctypes.byref(user)):
+            return None
+        # FILETIME counts 100ns intervals since 1601-01-01
+        ticks = (creation.dwHighDateTime << 32) | creation.dwLowDateTime
+        return ticks / 10_000_000 - 11_644_473_600
+    finally:
+        kernel32.CloseHandle(handle)
+
+
+def _linux_process_start_time(pid):
+    with open(f'/proc/{pid}/stat', 'r') as file:
+        # The command name may contain spaces, fields are counted after it
+        fields = file.read().rsplit(')', 1)[1].split()
+    start_ticks = int(fields[19])
+    with open('/proc/stat', 'r') as file:
+        boot_time = next(int(line.split()[1]) for line in file if line.startswith('btime'))
+    return boot_time + start_ticks / os.sysconf('SC_CLK_TCK')
+
+
+class StartupProfiler:
+    def __init__(self):
+        # Offsets are measured against the first import of this module, which
+        # main.py does before anything else
+        self.origin = time.perf_counter()
+        self.origin_wall = time.time()
+        self.enabled = False
+        self.report_path = None
+        self.phases = []
+        self.profile_tabs = []
+        self.info = {}
+
+    def enable(self, report_path=None):
+        self.enabled = True
+        self.report_path = report_path or STARTUP_PROFILE_FILE
+
+    def enable_from_environment(self):
+        report_path = os.environ.get(STARTUP_PROFILE_ENV)
+        if report_path:
+            self.enable(report_path)
+
+    def _offset_ms(self, timestamp=None):
+        return round(((time.perf_counter() if timestamp is None else timestamp) - self.origin) * 1000, 3)
+
+    @contextmanager
+    def phase(self, name):
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append({
+                'name': name,
+                'start_ms': self._offset_ms(start),
+                'duration_ms': round((time.perf_counter() - start) * 1000, 3),
+            })
+
+    @contextmanager
+    def profile_tab(self, profile_name):
+        # Cost of building one profile editor (widgets plus load_profile_settings)
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.profile_tabs.append({
+                'profile': profile_name,
+                'start_ms': self._offset_ms(start),
+                'duration_ms': round((time.perf_counter() - start) * 1000, 3),
+            })
+
+    def mark(self, name):
+        if self.enabled:
+            self.phases.append({'name': name, 'start_ms': self._offset_ms(), 'duration_ms': 0.0})
+
+    def has_mark(self, name):
+        return any(phase['name'] == name for phase in self.phases)
+
+    def set_info(self, key, value):
+        if self.enabled:
+            self.info[key] = value
+
+    def report(self):
+        process_start = process_start_time()
+        pre_main_ms = None
+        if process_start is not None:
+            pre_main_ms = round((self.origin_wall - process_start) * 1000, 3)
+
+        # A PyInstaller --onefile build runs in a child of the bootloader
+        # process, which spends its time unpacking the archive
+        bootloader_ms = None
+        if getattr(sys, 'frozen', False) and hasattr(sys, '_MEIPASS') and process_start is not None:
+            parent_start = process_start_time(os.getppid())
+            if parent_start is not None:
+                bootloader_ms = round((process_start - parent_start) * 1000, 3)
+
+        def since_process_start(mark):
+            offset = next((phase['start_ms'] for phase in self.phases if phase['name'] == mark), None)
+            if offset is None:
+                return None
+            return round(offset + (pre_main_ms or 0) + (bootloader_ms or 0), 3)
+
+        # Interactive: painted and settings.json applied, whichever comes last
+        time_to_first_paint_ms = since_process_start('first_paint')
+        settings_loaded_ms = since_process_start('settings_loaded')
+        time_to_interactive_ms = None
+        if time_to_first_paint_ms is not None and settings_loaded_ms is not None:
+            time_to_interactive_ms = max(time_to_first_paint_ms, settings_loaded_ms)
+
+        return {
+            'version': REPORT_VERSION,
+            'timestamp': self.origin_wall,
+            'executable': sys.executable,
+            'frozen': bool(getattr(sys, 'frozen', False)),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'bootloader_ms': bootloader_ms,
+            'process_start_to_main_ms': pre_main_ms,
+            'time_to_first_paint_ms': time_to_first_paint_ms,
+            'time_to_interactive_ms': time_to_interactive_ms,
+            'phases': self.phases,
+            'profile_tabs': self.profile_tabs,
+            'profile_tabs_total_ms': round(sum(tab['duration_ms'] for tab in self.profile_tabs), 3),
+            'info': self.info,
+        }
+
+    def finish(self):
+        # Write the report once; later calls (and hooks) do nothing
+        if not self.enabled:
+            return None
+        self.enabled = False
+        try:
+            with open(self.report_path, 'w') as file:
+                json.dump(self.report(), file, indent=4)
+        except OSError:
+            return None
+        return self.report_path
+
+
+profiler = StartupProfiler()
@@ -0,0 +1,124 @@
+import os
+
+from persistence import atomic_write, read_bytes
+from settings_schema import TOML_SCHEMA
+
+ALTV_TOML = 'altv.toml'
+
+
+def format_toml_value(value):
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (int, float)):
+        return str(value)
+    escaped = str(value).replace('\\', '\\\\').replace('"', '\\"')
+    return f'"{escaped}"'
+
+
+def line_key(line):
+    # Key of a `key = value` line, or None for comments, tables and blanks
+    stripped = line.strip()
+    if not stripped or stripped.startswith(('#', '[')) or '=' not in stripped:
+        return None
+    return stripped.split('=', 1)[0].strip().strip('"\'')
+
+
+class TomlTransaction:
+    # Batches updates to top-level keys of altv.toml into a single read and a
+    # single atomic write. Nothing is written when the patched file would be
+    # byte-for-byte identical to what is already on disk.
+    #
+    #     with TomlTransaction(path) as config:
+    #         config.set('debug', True)
+    #         config.set('branch', 'dev')
+
+    def __init__(self, path, files=None):
+        self.path = path
+        self.files = files  # Optional ConfigFileCache to read from and keep up to date
+        self.updates = {}
+        self.changed = False
+
+    def set(self, key, value):
+        self.updates[key] = value
+        return self
+
+    def set_many(self, updates):
+        self.updates.update(updates)
+        return self
+
+    def render(self, original):
+        text = original.decode('utf-8')
+        newline = '\r\n' if '\r\n' in text else '\n'
+        lines = text.splitlines(keepends=True)
+
+        new_lines = []
+        pending = dict(self.updates)
+        in_root_table = True
+        for line in lines:
+            if line.strip().startswith('['):
+                if in_root_table:
+                    # Keys missing from the root table must go before the first [table]
+                    new_lines.extend(self._render_missing(pending, new_lines, newline))
+                in_root_table = False
+            key = line_key(line) if in_root_table else None
+            if key is not None and key in self.updates:
+                ending = line[len(line.rstrip('\r\n')):] or newline
+                new_lines.append(f'{key} = {format_toml_value(self.updates[key])}{ending}')
+                pending.pop(key, None)
+            else:
+                new_lines.append(line)
+
+        if in_root_table:
+            new_lines.extend(self._render_missing(pending, new_lines, newline))
+        return ''.join(new_lines).encode('utf-8')
+
+    def _render_missing(self, pending, new_lines, newline):
+        if not pending:
+            return []
+        missing = []
+        if new_lines and not new_lines[-1].endswith('\n'):
+            missing.append(newline)
+        missing.extend(f'{key} = {format_toml_value(value)}{newline}' for key, value in pending.items())
+        pending.clear()
+        return missing
+
+    def commit(self):
+        # Returns True when altv.toml was rewritten. A missing file is left
+        # alone, just like the launcher has always done.
+        self.changed = False
+        if not self.updates:
+            return False
+        if self.files is not None:
+            original = self.files.read(self.path)
+        else:
+            try:
+                original = read_bytes(self.path)
+            except FileNotFoundError:
+                original = None
+        if original is None:
+            return False
+
+        patched = self.render(original)
+        if patched == original:
+            return False
+        atomic_write(self.path, patched)
+        if self.files is not None:
+            self.files.store(self.path, patched)
+        self.changed = True
+        return True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        return False
+
+
+def altv_toml_path(altv_folder):
+    return os.path.join(altv_folder, ALTV_TOML)
+
+
+def toml_values_for_profile(profile):
+    return {setting.key: setting.encode(getattr(profile, setting.attribute)) for setting in TOML_SCHEMA}